@@ -0,0 +1,117 @@
+# Dashboard activity charts on a ledger spanning months: hourly counts from the
+# rollup table vs a GROUP BY over the transactions, the cost of keeping the
+# rollup on insert, and chart payload size and downsampling time for LTTB and
+# min/max bucketing against sending every hour.
+# Run from the repo root: python benchmarks/bench_activity.py [transactions]
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import plotly.graph_objects as go
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from descience.downsample import lttb, minmax
+from descience.ledger import LedgerStore
+
+TRANSACTIONS = 1_000_000
+# Spread over about 18 months, with a daily cycle and a few bursts
+SPAN_HOURS = 18 * 30 * 24
+SUBMITTERS = 50
+BATCH_SIZE = 50_000
+POINTS = 500
+
+
+def make_batch(start, count, rng):
+    hours = rng.integers(0, SPAN_HOURS, count)
+    # Busier in the working day, and ten times busier in a few burst weeks
+    keep = (rng.random(count) < 0.3 + 0.7 * ((hours % 24 >= 8) & (hours % 24 < 18))) | (hours // (24 * 7) % 11 == 0)
+    base = np.datetime64("2024-01-01T00")
+    return [
+        {
+            "transaction_hash": f"0x{start + i:064x}",
+            "block_number": 18_000_000 + start + i,
+            "timestamp": str(base + np.timedelta64(int(h), "h")).replace("T", " ") + f":{i % 60:02d}:00",
+            "node": f"researcher{(start + i) % SUBMITTERS}",
+            "data_type": "Research Data",
+            "data_hash": hashlib.sha256(str(start + i).encode()).hexdigest(),
+            "filename": f"sample-{start + i}.fastq",
+            "status": "confirmed",
+        }
+        for i, h in enumerate(hours[keep])
+    ]
+
+
+def fill(store, total):
+    rng = np.random.default_rng(3)
+    batches = []
+    written = 0
+    while written < total:
+        batch = make_batch(written, min(BATCH_SIZE, total - written) * 2, rng)[:total - written]
+        batches.append(batch)
+        written += len(batch)
+    start = time.perf_counter()
+    for batch in batches:
+        store.append_many(batch)
+    return time.perf_counter() - start, batches
+
+
+def timed(fn, repeats=5):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    return (time.perf_counter() - start) / repeats, result
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else TRANSACTIONS
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LedgerStore(os.path.join(tmp, "ledger.db"), synchronous="OFF")
+        with_rollup, batches = fill(store, total)
+        plain = LedgerStore(os.path.join(tmp, "plain.db"), synchronous="OFF")
+        plain._conn().execute("DROP TRIGGER transactions_activity")
+        start = time.perf_counter()
+        for batch in batches:
+            plain.append_many(batch)
+        without_rollup = time.perf_counter() - start
+        plain.close()
+        print(f"{total:,} records: append {total / with_rollup:,.0f}/s with the rollup trigger, "
+              f"{total / without_rollup:,.0f}/s without")
+
+        conn = store._conn()
+        scan = lambda: conn.execute(
+            "SELECT substr(timestamp, 1, 13), COUNT(*) FROM transactions GROUP BY 1 ORDER BY 1"
+        ).fetchall()
+        scan_node = lambda: conn.execute(
+            "SELECT substr(timestamp, 1, 13), COUNT(*) FROM transactions WHERE node = ? GROUP BY 1 ORDER BY 1",
+            ("researcher7",),
+        ).fetchall()
+        for label, rollup, naive in [("all submitters", store.hourly_activity, scan),
+                                     ("one submitter", lambda: store.hourly_activity(node="researcher7"), scan_node)]:
+            rollup_s, rows = timed(rollup)
+            naive_s, naive_rows = timed(naive, repeats=1)
+            assert rows == [tuple(r) for r in naive_rows]
+            print(f"hourly counts, {label}: rollup {rollup_s * 1000:.1f} ms, scan {naive_s * 1000:.0f} ms "
+                  f"({len(rows):,} hours)")
+        store.close()
+
+    values = np.zeros(SPAN_HOURS)
+    hours, counts = zip(*rows)
+    index = {h: i for i, h in enumerate(sorted(set(hours)))}
+    for h, c in zip(hours, counts):
+        values[index[h]] = c
+    x = np.arange(len(values))
+    full = len(go.Figure(go.Scatter(x=x, y=values, mode="lines")).to_json())
+    print(f"chart payload, every hour ({len(values):,} points): {full / 1024:.0f} KiB")
+    for label, pick in [("LTTB", lambda: lttb(values, POINTS)), ("min/max", lambda: minmax(values, POINTS // 2))]:
+        seconds, kept = timed(pick)
+        size = len(go.Figure(go.Scatter(x=x[kept], y=values[kept], mode="lines")).to_json())
+        print(f"chart payload, {label} ({len(kept)} points): {size / 1024:.0f} KiB, "
+              f"downsampled in {seconds * 1000:.1f} ms, peak kept: {values[kept].max() == values.max()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# Anchoring throughput against the in-process LocalChain stand-in: a fresh
+# connection per request vs the pooled session, one anchor per request vs
+# JSON-RPC batches, and time from submission to confirmation in the ledger.
+# Run from the repo root: python benchmarks/bench_chain.py
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from descience.anchoring import anchor_files
+from descience.chain import ConfirmationTracker, JsonRpcChain
+from descience.ledger import LedgerStore
+from descience.localchain import LocalChain
+
+ANCHORS = 2_000
+BATCH_SIZE = 100
+
+
+def hashes(count, salt):
+    return [hashlib.sha256(f"{salt}-{i}".encode()).hexdigest() for i in range(count)]
+
+
+def run(label, chain, data_hashes, batch_size):
+    start = time.perf_counter()
+    for i in range(0, len(data_hashes), batch_size):
+        chain.send_anchors(data_hashes[i:i + batch_size])
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {len(data_hashes) / elapsed:,.0f} anchors/s")
+
+
+def main():
+    local = LocalChain(block_time=0.5).start()
+
+    unpooled = JsonRpcChain(local.url)
+    # requests.post opens (and closes) a new connection for every call
+    unpooled.session = requests
+    run("new connection per request, 1 anchor/request", unpooled, hashes(ANCHORS // 4, "unpooled"), 1)
+
+    pooled = JsonRpcChain(local.url)
+    run("pooled session, 1 anchor/request", pooled, hashes(ANCHORS, "pooled"), 1)
+    run(f"pooled session, {BATCH_SIZE} anchors/batch", pooled, hashes(ANCHORS * 10, "batched"), BATCH_SIZE)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LedgerStore(os.path.join(tmp, "ledger.db"))
+        tracker = ConfirmationTracker(store, pooled, interval=0.05)
+        latencies = []
+        for i in range(10):
+            files = [(f"file-{i}-{j}", h, 0) for j, h in enumerate(hashes(50, f"confirm-{i}"))]
+            start = time.perf_counter()
+            records = anchor_files(store, files, "bench", pooled)
+            submitted = time.perf_counter() - start
+            tracker.wait([records[0]["transaction_hash"]], timeout=10)
+            latencies.append((submitted, time.perf_counter() - start))
+        store.close()
+    submit = sorted(s for s, _ in latencies)[len(latencies) // 2]
+    confirm = sorted(c for _, c in latencies)[len(latencies) // 2]
+    print(f"50-file batch: submitted in {submit * 1000:.1f} ms (median), "
+          f"confirmed after {confirm * 1000:.0f} ms with {local.block_time:g}s blocks")
+    local.stop()
+
+
+if __name__ == "__main__":
+    main()
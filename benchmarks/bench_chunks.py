@@ -0,0 +1,78 @@
+# Content-defined chunking of incremental dataset versions: chunking
+# throughput against a plain SHA-256 pass, how many chunks each new version
+# adds to the store, and how precisely the diff locates the edits.
+# Run from the repo root: python benchmarks/bench_chunks.py [MiB]
+import hashlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from descience.chunks import ChunkStore, chunk_stream, diff_chunks
+
+SIZE_MIB = 64
+VERSIONS = 10
+
+
+# Sensor-style CSV of roughly size bytes
+def make_dataset(size):
+    rng = random.Random(42)
+    rows, total, i = [], 0, 0
+    while total < size:
+        row = f"{i},2024-06-01T{i % 24:02d}:{i % 60:02d}:00,station-{i % 40},{rng.gauss(20, 5):.4f},{rng.random():.6f}\n"
+        rows.append(row)
+        total += len(row)
+        i += 1
+    return "".join(rows).encode()
+
+
+# Next version: a few rows appended, one edited in place, one inserted mid-file
+def next_version(data, n, rng):
+    edit = rng.randrange(len(data) - 100)
+    insert = rng.randrange(len(data))
+    data = data[:edit] + b"9" * 8 + data[edit + 8:]
+    data = data[:insert] + f"inserted-{n},0,0,0,0\n".encode() + data[insert:]
+    return data + b"".join(f"{n}-{j},appended,0,0,0\n".encode() for j in range(200))
+
+
+def main():
+    size = (int(sys.argv[1]) if len(sys.argv) > 1 else SIZE_MIB) * 1024 * 1024
+    data = make_dataset(size)
+    rng = random.Random(7)
+
+    start = time.perf_counter()
+    hashlib.sha256(data).hexdigest()
+    sha_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    result = chunk_stream(io.BytesIO(data))
+    chunk_seconds = time.perf_counter() - start
+    sizes = [s for _, s, _ in result["chunks"]]
+    print(f"{len(data) / 1024 / 1024:.0f} MiB: SHA-256 {len(data) / sha_seconds / 1e6:,.0f} MB/s, "
+          f"chunk + SHA-256 {len(data) / chunk_seconds / 1e6:,.0f} MB/s, "
+          f"{len(sizes)} chunks averaging {sum(sizes) / len(sizes) / 1024:.0f} KiB")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ChunkStore(os.path.join(tmp, "chunks.db"))
+        store.record(result["digest"], "station.csv", result["chunks"])
+        previous = result
+        for n in range(1, VERSIONS + 1):
+            data = next_version(data, n, rng)
+            result = chunk_stream(io.BytesIO(data))
+            new = store.record(result["digest"], "station.csv", result["chunks"])
+            diff = diff_chunks(result["chunks"], [(d, s) for _, s, d in previous["chunks"]])
+            changed = sum(length for _, length in diff["changed"])
+            print(f"version {n:2d}: {new:3d} new of {len(result['chunks'])} chunks, "
+                  f"{len(diff['changed'])} changed range(s) covering {changed / 1024:.0f} KiB "
+                  f"({changed * 100 / len(data):.2f}% of the file)")
+            previous = result
+        store.close()
+        db = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp))
+        print(f"chunk store for {VERSIONS + 1} versions: {db / 1024:.0f} KiB on disk")
+
+
+if __name__ == "__main__":
+    main()
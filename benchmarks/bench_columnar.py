@@ -0,0 +1,107 @@
+# Columnar ledger export/import: throughput, file size, peak memory, and a
+# round-trip check that every hash, timestamp and Merkle proof survives intact.
+# Run from the repo root: python benchmarks/bench_columnar.py [transactions]
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from descience.columnar import export_ledger, export_nodes, import_ledger, import_nodes, load_table
+from descience.ledger import LedgerStore
+from descience.nodes import NodeRegistry, build_node, default_nodes
+
+TRANSACTIONS = 200_000
+BATCH_SIZE = 10_000
+
+
+def make_tx(i):
+    data_hash = hashlib.sha256(str(i).encode()).hexdigest()
+    tx = {
+        "transaction_hash": f"0x{hashlib.sha256(data_hash.encode()).hexdigest()}",
+        "block_number": 18_000_000 + i,
+        "timestamp": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d} {i % 24:02d}:{i % 60:02d}:{i % 59:02d}",
+        "node": f"researcher{i % 50}",
+        "data_type": "Research Data",
+        "data_hash": data_hash,
+        "filename": f"run-{i // 1000}/sample-{i}.fastq",
+        "status": "confirmed",
+    }
+    if i % 3:
+        tx["merkle_root"] = hashlib.sha256(str(i // 100).encode()).hexdigest()
+        tx["merkle_proof"] = [[hashlib.sha256(str(i + d).encode()).hexdigest(), "L" if d % 2 else "R"] for d in range(7)]
+    return tx
+
+
+def fill(store, count):
+    for start in range(0, count, BATCH_SIZE):
+        store.append_many([make_tx(i) for i in range(start, min(start + BATCH_SIZE, count))])
+
+
+def measure(label, fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label}: {elapsed:.2f}s (traced), peak Python heap {peak / 1024 / 1024:.1f} MiB")
+    return result
+
+
+# Compare the stores row by row, streaming both, so the check itself stays bounded
+def assert_same(original, restored):
+    compared = 0
+    for a_chunk, b_chunk in zip(original.scan(BATCH_SIZE), restored.scan(BATCH_SIZE)):
+        assert len(a_chunk) == len(b_chunk)
+        for a, b in zip(a_chunk, b_chunk):
+            for column in ["transaction_hash", "block_number", "timestamp", "node", "data_hash", "filename", "status"]:
+                assert a[column] == b[column], (column, a[column], b[column])
+            assert (json.loads(a["extra"]) if a["extra"] else None) == (json.loads(b["extra"]) if b["extra"] else None)
+        compared += len(a_chunk)
+    assert compared == original.count() == restored.count(), (compared, original.count(), restored.count())
+    return compared
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else TRANSACTIONS
+    with tempfile.TemporaryDirectory() as tmp:
+        source = LedgerStore(os.path.join(tmp, "source.db"), synchronous="OFF")
+        fill(source, count)
+        db_size = os.path.getsize(os.path.join(tmp, "source.db"))
+        print(f"{count:,} transactions, SQLite {db_size / 1024 / 1024:.1f} MiB")
+
+        for name in ["ledger.parquet", "ledger.arrow"]:
+            path = os.path.join(tmp, name)
+            rows = measure(f"export {name}", lambda: export_ledger(source, path))
+            assert rows == count
+            print(f"  {os.path.getsize(path) / 1024 / 1024:.1f} MiB on disk")
+
+            restored = LedgerStore(os.path.join(tmp, f"restored-{name}.db"), synchronous="OFF")
+            measure(f"import {name}", lambda: import_ledger(restored, path))
+            print(f"  round trip intact: {assert_same(source, restored):,} rows compared")
+            restored.close()
+
+            start = time.perf_counter()
+            hashes = load_table(path, columns=["data_hash"]).column("data_hash")
+            assert hashes[count - 1].as_py() == make_tx(count - 1)["data_hash"]
+            print(f"  load data_hash column: {(time.perf_counter() - start) * 1000:.1f} ms")
+        source.close()
+
+        extra_nodes = [dict(build_node(f"researcher{i}"), id=f"NODE-X{i:04d}") for i in range(1000)]
+        registry = NodeRegistry(default_nodes() + extra_nodes)
+        path = os.path.join(tmp, "nodes.parquet")
+        export_nodes(registry, path)
+        copy = NodeRegistry()
+        assert import_nodes(copy, path) == len(registry)
+        assert copy.snapshot() == registry.snapshot()
+        assert import_nodes(copy, path) == 0
+        print(f"nodes round trip intact: {len(copy)} nodes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# Verification lookup latency: the ledger's data_hash index vs the old linear
+# scan over a list of transaction dicts.
+# Run from the repo root: python benchmarks/bench_hash_index.py
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from descience.ledger import LedgerStore
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+LOOKUPS = 1_000
+# The linear scan is too slow to run enough lookups beyond this size
+MAX_SCAN_SIZE = 100_000
+
+
+def make_ledger(n):
+    return [
+        {
+            "transaction_hash": f"0x{i:064x}",
+            "data_hash": hashlib.sha256(str(i).encode()).hexdigest(),
+            "node": "researcher1",
+        }
+        for i in range(n)
+    ]
+
+
+def linear_scan(ledger, data_hash):
+    for tx in ledger:
+        if tx.get("data_hash") == data_hash:
+            return tx
+    return None
+
+
+def time_lookups(lookup, hashes):
+    start = time.perf_counter()
+    for data_hash in hashes:
+        lookup(data_hash)
+    return (time.perf_counter() - start) / len(hashes) * 1e6
+
+
+def main():
+    print(f"{'records':>10} {'index us/lookup':>16} {'scan us/lookup':>16}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in SIZES:
+            ledger = make_ledger(n)
+            # Seeding speed isn't what's measured here, so skip the fsyncs
+            store = LedgerStore(os.path.join(tmp, f"ledger-{n}.db"), synchronous="OFF")
+            store.append_many(ledger)
+            hashes = [random.choice(ledger)["data_hash"] for _ in range(LOOKUPS)]
+            indexed = time_lookups(store.lookup, hashes)
+            if n <= MAX_SCAN_SIZE:
+                scanned = f"{time_lookups(lambda h: linear_scan(ledger, h), hashes[:100]):16.2f}"
+            else:
+                scanned = f"{'skipped':>16}"
+            print(f"{n:>10} {indexed:16.2f} {scanned}")
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# Cold-start and per-rerun cost of streamlit_app.py.
+# Each sample runs in a fresh interpreter under `python -X importtime`, renders
+# the login page once (cold start) and then reruns it (warm reruns).
+# Run from the repo root: python benchmarks/bench_import_time.py
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLES = 5
+RERUNS = 20
+TOP_IMPORTS = 10
+
+DRIVER = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+start = time.perf_counter()
+at.run()
+cold = time.perf_counter() - start
+reruns = []
+for _ in range(int(sys.argv[2])):
+    start = time.perf_counter()
+    at.run()
+    reruns.append(time.perf_counter() - start)
+print(json.dumps({"cold": cold, "reruns": reruns}))
+"""
+
+
+# Cumulative microseconds per module, as reported by -X importtime
+def parse_importtime(stderr):
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        fields = line.split(":", 1)[1].split("|")
+        name = fields[2].strip()
+        cumulative[name] = max(cumulative.get(name, 0), int(fields[1]))
+    return cumulative
+
+
+def run_sample(ledger_path):
+    env = dict(os.environ, DESCIENCE_LEDGER_PATH=ledger_path)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", DRIVER, os.path.join(ROOT, "streamlit_app.py"), str(RERUNS)],
+        capture_output=True, text=True, cwd=ROOT, env=env, check=True,
+    )
+    timings = json.loads(proc.stdout.strip().splitlines()[-1])
+    return timings, parse_importtime(proc.stderr)
+
+
+def main():
+    colds, reruns, imports = [], [], {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(SAMPLES):
+            timings, cumulative = run_sample(os.path.join(tmp, f"ledger-{i}.db"))
+            colds.append(timings["cold"])
+            reruns.extend(timings["reruns"])
+            for name, us in cumulative.items():
+                imports.setdefault(name, []).append(us)
+
+    print(f"cold start (first script run): median {statistics.median(colds) * 1000:.1f} ms over {SAMPLES} runs")
+    print(f"warm rerun: median {statistics.median(reruns) * 1000:.1f} ms, "
+          f"max {max(reruns) * 1000:.1f} ms over {len(reruns)} reruns")
+    print("\nheaviest top-level imports (median cumulative ms):")
+    top_level = {name: statistics.median(us) for name, us in imports.items() if "." not in name}
+    for name, us in sorted(top_level.items(), key=lambda item: -item[1])[:TOP_IMPORTS]:
+        print(f"  {name:<24} {us / 1000:8.1f}")
+    for name in ["plotly.express", "PIL", "requests"]:
+        print(f"  {name} imported: {'yes' if name in imports else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# Sustained ingestion through the background job queue: many concurrent
+# submitters queue files and seal jobs while a fixed pool of workers drains
+# them against the LocalChain stand-in. Reports submit latency (what a user
+# waits for) against job completion latency (enqueue until a worker records
+# the job done, sampled every 10 ms), for 1, 2 and 4 workers.
+# Run from the repo root: python benchmarks/bench_jobs.py
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from descience.anchoring import anchoring_job_handlers
+from descience.chain import JsonRpcChain
+from descience.jobs import JobQueue, JobWorkers
+from descience.ledger import LedgerStore
+from descience.localchain import LocalChain
+
+SUBMITTERS = 16
+SUBMISSIONS = 25
+FILES_PER_SUBMISSION = 20
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def run(tmp, chain, workers):
+    store = LedgerStore(os.path.join(tmp, f"ledger-{workers}.db"))
+    queue = JobQueue(os.path.join(tmp, f"jobs-{workers}.db"))
+    pool = JobWorkers(queue, anchoring_job_handlers(store, queue, chain), workers=workers, poll_interval=0.05).start()
+    submit_times, job_ids = [], []
+    enqueued, finished = {}, {}  # job id -> perf_counter when queued / first seen done
+    lock = threading.Lock()
+
+    def submitter(n):
+        for i in range(SUBMISSIONS):
+            files = [
+                (hashlib.sha256(f"{workers}-{n}-{i}-{j}".encode()).hexdigest(), f"s{n}/f{i}-{j}")
+                for j in range(FILES_PER_SUBMISSION)
+            ]
+            start = time.perf_counter()
+            store.add_pending_many(files, f"user{n}")
+            job_id = queue.enqueue("seal", {"sealed_by": f"user{n}"}, f"user{n}")
+            now = time.perf_counter()
+            with lock:
+                submit_times.append(now - start)
+                job_ids.append(job_id)
+                enqueued[job_id] = now
+
+    done = threading.Event()
+
+    def watcher():
+        conn = queue._conn()
+        while not done.is_set():
+            now = time.perf_counter()
+            for (job_id,) in conn.execute("SELECT id FROM jobs WHERE status IN ('done', 'failed')"):
+                finished.setdefault(job_id, now)
+            time.sleep(0.01)
+
+    start = time.perf_counter()
+    watch = threading.Thread(target=watcher)
+    watch.start()
+    threads = [threading.Thread(target=submitter, args=(n,)) for n in range(SUBMITTERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    while len(finished) < len(job_ids):
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    done.set()
+    watch.join()
+    pool.stop()
+    completion_times = [finished[j] - enqueued[j] for j in job_ids]
+    return store, queue, job_ids, submit_times, completion_times, elapsed
+
+
+def main():
+    local = LocalChain(block_time=0.5).start()
+    chain = JsonRpcChain(local.url)
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in [1, 2, 4]:
+            store, queue, job_ids, submit_times, completion_times, elapsed = run(tmp, chain, workers)
+            anchored = sum((queue.get(j)["result"] or {}).get("files", 0) for j in job_ids)
+            failed = queue.counts().get("failed", 0)
+            print(f"{workers} worker(s): {anchored / elapsed:,.0f} files/s anchored, "
+                  f"submit p50 {percentile(submit_times, 50) * 1000:.1f} ms / p99 {percentile(submit_times, 99) * 1000:.1f} ms, "
+                  f"completion p50 {percentile(completion_times, 50) * 1000:.0f} ms / "
+                  f"p99 {percentile(completion_times, 99) * 1000:.0f} ms, {failed} failed jobs")
+            store.close()
+            queue.close()
+    local.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# Durable append throughput of the SQLite ledger store.
+# Run from the repo root: python benchmarks/bench_ledger_append.py
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from descience.ledger import LedgerStore
+
+APPENDS = 5_000
+BATCH_SIZE = 500
+
+
+def make_tx(i):
+    return {
+        "transaction_hash": f"0x{i:064x}",
+        "block_number": i,
+        "timestamp": "2024-01-01 00:00:00",
+        "node": "researcher1",
+        "data_type": "Research Data",
+        "data_hash": hashlib.sha256(str(i).encode()).hexdigest(),
+        "filename": f"file-{i}.csv",
+        "status": "confirmed",
+    }
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        for synchronous in ["FULL", "NORMAL"]:
+            store = LedgerStore(os.path.join(tmp, f"single-{synchronous}.db"), synchronous=synchronous)
+            start = time.perf_counter()
+            for i in range(APPENDS):
+                store.append(make_tx(i))
+            elapsed = time.perf_counter() - start
+            print(f"single appends, synchronous={synchronous}: {APPENDS / elapsed:,.0f}/s")
+            store.close()
+
+        store = LedgerStore(os.path.join(tmp, "batched.db"))
+        txs = [make_tx(i) for i in range(APPENDS)]
+        start = time.perf_counter()
+        for i in range(0, APPENDS, BATCH_SIZE):
+            store.append_many(txs[i:i + BATCH_SIZE])
+        elapsed = time.perf_counter() - start
+        print(f"batched appends ({BATCH_SIZE}/commit), synchronous=FULL: {APPENDS / elapsed:,.0f}/s")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+# Concurrent-session load test. Simulated users of every role log in and work
+# through their pages (dashboard, data anchoring, verification, node list, user
+# management, audit log) headlessly with AppTest, several sessions at once,
+# against a seeded ledger and node fleet. Reports p50/p95/p99 rerun latency per
+# step, throughput and memory per session, and compares them with a saved
+# baseline for the same settings so regressions show up before a deploy.
+# AppTest drives one script run at a time per process, so concurrent users are
+# separate processes sharing the SQLite stores; the users of one process share
+# its cache_resource objects the way sessions of one server do.
+# Run from the repo root:
+#   python benchmarks/bench_load.py [--sessions 40] [--concurrency 8] [--ledger 100000] [--nodes 5000]
+#   python benchmarks/bench_load.py --save    # (re)write the baseline for these settings
+# Exits with status 1 when p95 or p99 of a step regressed by more than --tolerance.
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from datetime import date
+
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from descience.columnar import export_nodes
+from descience.ledger import LedgerStore
+from descience.nodes import NodeRegistry
+
+APP = os.path.join(ROOT, "streamlit_app.py")
+BASELINE = os.path.join(ROOT, "benchmarks", "baselines", "load.json")
+USERS = [("researcher1", "research123", "researcher"), ("validator1", "validate123", "validator"),
+         ("auditor1", "audit123", "auditor"), ("admin", "admin123", "admin")]
+PERCENTILES = [50, 95, 99]
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def make_tx(i):
+    data_hash = hashlib.sha256(str(i).encode()).hexdigest()
+    return {
+        "transaction_hash": f"0x{hashlib.sha256(data_hash.encode()).hexdigest()}",
+        "block_number": 18_000_000 + i,
+        "timestamp": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d} {i % 24:02d}:{i % 60:02d}:{i % 59:02d}",
+        "node": f"researcher{1 + i % 50}",
+        "data_type": "Research Data",
+        "data_hash": data_hash,
+        "filename": f"run-{i // 1000}/sample-{i}.fastq",
+        "status": "confirmed",
+    }
+
+
+def make_node(i):
+    return {
+        "id": f"NODE-L{i:06d}",
+        "name": f"Load Node {i}",
+        "type": ["eDNA Sensor", "Space Telemetry", "Marine eDNA", "Research Node"][i % 4],
+        "location": f"Site {i % 97}",
+        "status": "active" if i % 5 else "pending",
+        "last_submission": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d} 00:00:00",
+        "data_points": i * 7 % 5000,
+        "verified": bool(i % 5),
+        "node_address": f"0x{hashlib.sha256(str(i).encode()).hexdigest()[:40]}",
+        "stake": float(8 + i % 40),
+        "owner": f"researcher{1 + i % 50}",
+    }
+
+
+# Point the app at fresh stores in data_dir, with a ledger of `transactions`
+# records and `nodes` extra nodes
+def seed(data_dir, transactions, nodes):
+    for name, env in [("ledger.db", "DESCIENCE_LEDGER_PATH"), ("accounts.db", "DESCIENCE_ACCOUNTS_PATH"),
+                      ("jobs.db", "DESCIENCE_JOBS_PATH"), ("chunks.db", "DESCIENCE_CHUNKS_PATH")]:
+        os.environ[env] = os.path.join(data_dir, name)
+    store = LedgerStore(os.environ["DESCIENCE_LEDGER_PATH"], synchronous="OFF")
+    for start in range(0, transactions, 10_000):
+        store.append_many([make_tx(i) for i in range(start, min(transactions, start + 10_000))])
+    store.close()
+    if nodes:
+        os.environ["DESCIENCE_NODES_PATH"] = os.path.join(data_dir, "nodes.parquet")
+        export_nodes(NodeRegistry(make_node(i) for i in range(nodes)), os.environ["DESCIENCE_NODES_PATH"])
+
+
+def widget(elements, key):
+    return next(e for e in elements if e.key == key)
+
+
+# What each role does after logging in, as (step, action on the AppTest) pairs.
+# Every rerun renders all of the role's tabs, so "rerun" is a full page view.
+def verify_upload(transactions):
+    content = str(transactions // 2).encode()
+    return lambda at: widget(at.file_uploader, "verify").set_value(("sample.txt", content, "text/plain")).run()
+
+
+def steps(role, transactions):
+    common = [("rerun", lambda at: at.run())]
+    if role == "researcher":
+        return common + [
+            ("anchoring mode", lambda at: widget(at.radio, "anchoring_mode").set_value("Bulk").run()),
+            ("my data filter", lambda at: widget(at.date_input, "my_data_from").set_value(date(2024, 6, 1)).run()),
+        ]
+    if role == "validator":
+        return common + [
+            ("verify upload", verify_upload(transactions)),
+            ("nodes sort", lambda at: widget(at.selectbox, "nodes_sort").set_value("Stake").run()),
+        ]
+    if role == "auditor":
+        return common + [
+            ("audit filter", lambda at: widget(at.text_input, "audit_submitter").input("researcher7").run()),
+            ("nodes filter", lambda at: widget(at.selectbox, "nodes_filter_status").set_value("pending").run()),
+        ]
+    return common + [
+        ("verify upload", verify_upload(transactions)),
+        ("users filter", lambda at: widget(at.selectbox, "users_role").set_value("researcher").run()),
+        ("nodes page size", lambda at: widget(at.selectbox, "nodes_page_size").set_value(100).run()),
+    ]
+
+
+# One simulated user: load the login page, log in, then run the role's steps.
+# Returns the session (kept alive for the memory figure) and its timings.
+def session(n, transactions):
+    username, password, role = USERS[n % len(USERS)]
+    timings = []
+
+    def timed(step, action):
+        start = time.perf_counter()
+        action()
+        timings.append((step, time.perf_counter() - start))
+        if at.exception:
+            raise RuntimeError(f"{step} ({role}): {at.exception[0].value}")
+
+    at = AppTest.from_file(APP, default_timeout=300)
+    timed("first load", at.run)
+    inputs = {t.label: t for t in at.text_input}
+    inputs["Username"].input(username)
+    inputs["Password"].input(password)
+    timed("login", lambda: next(b for b in at.button if b.label == "Login").click().run())
+    for step, action in steps(role, transactions):
+        timed(step, lambda: action(at))
+    return at, timings
+
+
+def rss_mib():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# One process worth of users, run one after another. A warm-up session first
+# fills the process-wide caches, as on a server that has been up for a while;
+# then all processes start their users together.
+def worker(users, transactions, barrier, results):
+    session(len(USERS) - 1, transactions)
+    before = rss_mib()
+    barrier.wait()
+    start = time.time()
+    sessions, timings = [], []
+    for n in users:
+        at, session_timings = session(n, transactions)
+        sessions.append(at)
+        timings.extend(session_timings)
+    results.put((timings, start, time.time(), rss_mib(), (rss_mib() - before) / max(1, len(sessions))))
+
+
+def run(args):
+    barrier = multiprocessing.Barrier(args.concurrency)
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=worker, args=(range(w, args.sessions, args.concurrency), args.ledger,
+                                                     barrier, results))
+        for w in range(args.concurrency)
+    ]
+    for p in processes:
+        p.start()
+    outcomes = [results.get() for _ in processes]
+    for p in processes:
+        p.join()
+
+    timings = [t for outcome in outcomes for t in outcome[0]]
+    elapsed = max(o[2] for o in outcomes) - min(o[1] for o in outcomes)
+    by_step = {}
+    for step, seconds in timings:
+        by_step.setdefault(step, []).append(seconds)
+    by_step["all reruns"] = [seconds for _, seconds in timings]
+    return {
+        "steps": {
+            step: {f"p{p}": round(percentile(values, p) * 1000, 1) for p in PERCENTILES} | {"count": len(values)}
+            for step, values in by_step.items()
+        },
+        "reruns_per_s": round(len(timings) / elapsed, 2),
+        "sessions_per_s": round(args.sessions / elapsed, 2),
+        "peak_rss_mib": round(max(o[3] for o in outcomes), 1),
+        "mib_per_session": round(sum(o[4] for o in outcomes) / len(outcomes), 3),
+    }
+
+
+def config_key(args):
+    return f"sessions={args.sessions} concurrency={args.concurrency} ledger={args.ledger} nodes={args.nodes}"
+
+
+def report(result, baseline):
+    print(f"{'step':<16} {'runs':>5} " + " ".join(f"{f'p{p} ms':>9}" for p in PERCENTILES)
+          + ("   vs baseline p95/p99" if baseline else ""))
+    for step, stats in result["steps"].items():
+        line = f"{step:<16} {stats['count']:>5} " + " ".join(f"{stats[f'p{p}']:9.1f}" for p in PERCENTILES)
+        if baseline and step in baseline["steps"]:
+            old = baseline["steps"][step]
+            line += f"   {stats['p95'] / old['p95']:5.2f}x / {stats['p99'] / old['p99']:5.2f}x"
+        print(line)
+    print(f"throughput: {result['reruns_per_s']} reruns/s, {result['sessions_per_s']} sessions/s")
+    print(f"memory: {result['mib_per_session']} MiB per session, {result['peak_rss_mib']} MiB peak RSS")
+
+
+# Steps whose p95 or p99 grew by more than tolerance against the baseline
+def regressions(result, baseline, tolerance):
+    found = []
+    for step, stats in result["steps"].items():
+        old = baseline["steps"].get(step)
+        for p in ("p95", "p99"):
+            if old and stats[p] > old[p] * (1 + tolerance):
+                found.append(f"{step} {p}: {old[p]:.1f} -> {stats[p]:.1f} ms")
+    if result["mib_per_session"] > baseline["mib_per_session"] * (1 + tolerance) + 0.1:
+        found.append(f"memory per session: {baseline['mib_per_session']} -> {result['mib_per_session']} MiB")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test of streamlit_app.py")
+    parser.add_argument("--sessions", type=int, default=40, help="simulated users in total")
+    parser.add_argument("--concurrency", type=int, default=8, help="users active at once (one process each)")
+    parser.add_argument("--ledger", type=int, default=100_000, help="seeded ledger records")
+    parser.add_argument("--nodes", type=int, default=5_000, help="seeded nodes on top of the demo ones")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline file (JSON, keyed by settings)")
+    parser.add_argument("--save", action="store_true", help="store this run as the baseline for its settings")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95/p99 growth (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        seed(data_dir, args.ledger, args.nodes)
+        result = run(args)
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+    baseline = baselines.get(config_key(args))
+    report(result, baseline)
+
+    if args.save:
+        result["recorded"] = {"date": time.strftime("%Y-%m-%d"), "python": platform.python_version(),
+                              "streamlit": streamlit.__version__, "machine": platform.machine(),
+                              "cpus": os.cpu_count()}
+        baselines[config_key(args)] = result
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+    elif baseline:
+        found = regressions(result, baseline, args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        if found:
+            sys.exit(1)
+    else:
+        print("no baseline for these settings; run with --save to record one")
+
+
+if __name__ == "__main__":
+    main()
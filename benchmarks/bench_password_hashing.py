@@ -0,0 +1,66 @@
+# Logins per second at each password-hashing cost, single-threaded and under a
+# concurrent login storm going through the bounded KDF pool.
+# Run from the repo root: python benchmarks/bench_password_hashing.py
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from descience.accounts import AccountStore
+from descience.auth import authenticate_user
+from descience.passwords import (
+    KDF_WORKERS,
+    LegacySha256Hasher,
+    Pbkdf2Hasher,
+    ScryptHasher,
+    set_password_hasher,
+)
+
+PASSWORD = "Research123"
+LOGINS = 40
+# Simulated concurrent sessions hitting the login form at once
+STORM_SESSIONS = 32
+
+SETTINGS = [
+    LegacySha256Hasher(),
+    ScryptHasher(n=2 ** 12),
+    ScryptHasher(n=2 ** 14),
+    ScryptHasher(n=2 ** 15),
+    Pbkdf2Hasher(iterations=100_000),
+    Pbkdf2Hasher(iterations=600_000),
+]
+
+
+def describe(hasher):
+    params = vars(hasher)
+    return f"{hasher.name} {params}" if params else hasher.name
+
+
+def main():
+    print(f"KDF pool: {KDF_WORKERS} worker(s) on {os.cpu_count()} cores\n")
+    print(f"{'setting':<46} {'serial logins/s':>16} {'storm logins/s':>16}")
+    with tempfile.TemporaryDirectory() as data_dir:
+        accounts = AccountStore(os.path.join(data_dir, "accounts.db"))
+        accounts.seed({"user": {"password": "", "name": "Bench User", "role": "researcher", "verified": True}})
+        for hasher in SETTINGS:
+            set_password_hasher(hasher)
+            accounts.set_password("user", hasher.hash(PASSWORD))
+
+            start = time.perf_counter()
+            for _ in range(LOGINS):
+                authenticate_user(accounts, "user", PASSWORD)
+            serial = LOGINS / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=STORM_SESSIONS) as sessions:
+                list(sessions.map(lambda _: authenticate_user(accounts, "user", PASSWORD), range(LOGINS)))
+            storm = LOGINS / (time.perf_counter() - start)
+            print(f"{describe(hasher):<46} {serial:16.1f} {storm:16.1f}")
+        accounts.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# Memory held by app state as concurrent sessions pile up. Drives simulated
+# logged-in sessions headlessly with AppTest and uses tracemalloc to count live
+# allocations made from streamlit_app.py and the descience package, i.e. the
+# app's own state rather than Streamlit's per-session bookkeeping.
+# Run from the repo root: python benchmarks/bench_session_memory.py
+import os
+import tempfile
+import tracemalloc
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "streamlit_app.py")
+SESSIONS = 200
+CHECKPOINTS = [1, 10, 50, 100, 200]
+USERS = [("researcher1", "research123"), ("validator1", "validate123"),
+         ("auditor1", "audit123"), ("admin", "admin123")]
+
+
+def app_bytes():
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(True, APP),
+        tracemalloc.Filter(True, os.path.join(ROOT, "descience", "*")),
+    ])
+    return sum(stat.size for stat in snapshot.statistics("filename"))
+
+
+def new_session(username, password):
+    at = AppTest.from_file(APP, default_timeout=120).run()
+    inputs = {t.label: t for t in at.text_input}
+    inputs["Username"].input(username)
+    inputs["Password"].input(password)
+    next(b for b in at.button if b.label == "Login").click().run()
+    return at
+
+
+def main():
+    data_dir = tempfile.mkdtemp()
+    os.environ.setdefault("DESCIENCE_LEDGER_PATH", os.path.join(data_dir, "ledger.db"))
+    os.environ.setdefault("DESCIENCE_ACCOUNTS_PATH", os.path.join(data_dir, "accounts.db"))
+    os.environ.setdefault("DESCIENCE_JOBS_PATH", os.path.join(data_dir, "jobs.db"))
+    os.environ.setdefault("DESCIENCE_CHUNKS_PATH", os.path.join(data_dir, "chunks.db"))
+
+    tracemalloc.start()
+    sessions = []
+    first = None
+    print(f"{'sessions':>9} {'app state KiB':>14} {'KiB/extra session':>18}")
+    for i in range(SESSIONS):
+        sessions.append(new_session(*USERS[i % len(USERS)]))
+        if len(sessions) in CHECKPOINTS:
+            size = app_bytes()
+            first = first if first is not None else size
+            extra = (size - first) / 1024 / (len(sessions) - 1) if len(sessions) > 1 else 0.0
+            print(f"{len(sessions):>9} {size / 1024:14.1f} {extra:18.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# Node telemetry at fleet scale: ingest throughput for batches of pushed
+# submission events, memory per node, and the latency of the fleet-wide
+# aggregates the dashboard reads on every live refresh. Also checks that the
+# ring buffers and the registry agree on the totals.
+# Run from the repo root: python benchmarks/bench_telemetry.py [nodes]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from descience.nodes import NodeRegistry, build_node
+from descience.telemetry import NodeTelemetry
+
+NODES = 50_000
+EVENTS = 1_000_000
+BATCH_SIZE = 10_000
+READS = 50
+
+
+def make_registry(count):
+    nodes = []
+    for i in range(count):
+        node = build_node(f"researcher{i % 50}")
+        node["id"] = f"NODE-{i:06d}"
+        nodes.append(node)
+    return NodeRegistry(nodes)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else NODES
+    registry = make_registry(count)
+    telemetry = NodeTelemetry(registry)
+    rng = random.Random(1)
+    now = time.time()
+    # Events spread over the last half hour and the whole fleet, with a fifth
+    # of them from a hundred busy nodes
+    events = [
+        (f"NODE-{rng.randrange(count) if rng.random() < 0.8 else rng.randrange(100):06d}",
+         rng.randrange(1, 1 << 20), 1, now - rng.random() * 1800)
+        for _ in range(EVENTS)
+    ]
+    points_before = registry.total_data_points
+
+    start = time.perf_counter()
+    for i in range(0, len(events), BATCH_SIZE):
+        telemetry.ingest(events[i:i + BATCH_SIZE], now=now)
+    elapsed = time.perf_counter() - start
+    print(f"{count:,} nodes: ingested {len(events):,} events at {len(events) / elapsed:,.0f} events/s "
+          f"({BATCH_SIZE:,}/batch), {len(telemetry):,} nodes reporting")
+
+    buffers = telemetry.submissions.nbytes + telemetry.bytes.nbytes
+    print(f"ring buffers: {buffers / 1024 / 1024:.1f} MiB, "
+          f"{(telemetry.submissions.itemsize + telemetry.bytes.itemsize) * telemetry.window} bytes per node")
+
+    for label, read in [("summary (5 min)", lambda: telemetry.summary(minutes=5)),
+                        ("fleet series (60 min)", telemetry.fleet_series)]:
+        start = time.perf_counter()
+        for _ in range(READS):
+            read()
+        print(f"{label}: {(time.perf_counter() - start) / READS * 1000:.2f} ms")
+
+    _, submissions, sizes = telemetry.fleet_series()
+    assert submissions.sum() == len(events), (submissions.sum(), len(events))
+    assert sizes.sum() == sum(e[1] for e in events)
+    assert registry.total_data_points - points_before == len(events)
+    print("totals check: ring buffers and registry agree")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# Latency of the UI actions that end in st.rerun(): login, registration, node
+# registration and approving/rejecting a signup. Each action is timed from the
+# click to the end of the resulting script run(s), driven headlessly by AppTest.
+# Run from the repo root: python benchmarks/bench_ui_flows.py
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from descience.accounts import AccountStore
+
+APP = os.path.join(ROOT, "streamlit_app.py")
+REPEATS = 5
+
+
+def new_session():
+    return AppTest.from_file(APP, default_timeout=120).run()
+
+
+def button(at, label):
+    return next(b for b in at.button if b.label == label)
+
+
+def timed(action):
+    start = time.perf_counter()
+    action()
+    return time.perf_counter() - start
+
+
+def login(at, username, password):
+    inputs = {t.label: t for t in at.text_input}
+    inputs["Username"].input(username)
+    inputs["Password"].input(password)
+    return timed(lambda: button(at, "Login").click().run())
+
+
+def flow_login():
+    return login(new_session(), "researcher1", "research123")
+
+
+def flow_register():
+    at = new_session()
+    button(at, "Register").click().run()
+    inputs = {t.label: t for t in at.text_input}
+    inputs["Full Name"].input("Dr. Bench Mark")
+    inputs["Email"].input("bench@example.org")
+    inputs["Institution/Organization"].input("Benchmark Institute")
+    inputs["Username"].input(f"bench{time.perf_counter_ns()}")
+    inputs["Password"].input("Bench12345")
+    inputs["Confirm Password"].input("Bench12345")
+    return timed(lambda: button(at, "Register").click().run())
+
+
+def flow_register_node():
+    at = new_session()
+    login(at, "researcher1", "research123")
+    return timed(lambda: button(at, "➕ Register New Node").click().run())
+
+
+# Admin session looking at a single pending signup, queued straight into the
+# shared account store
+def _admin_with_request():
+    username = f"pending{time.perf_counter_ns()}"
+    AccountStore().add_request({
+        "username": username, "password": "x", "name": "Pending User", "email": "p@example.org",
+        "role": "researcher", "institution": "Bench", "request_date": "2024-01-01 00:00:00"
+    })
+    at = new_session()
+    login(at, "admin", "admin123")
+    return at, username
+
+
+def flow_approve():
+    at, username = _admin_with_request()
+    return timed(lambda: next(b for b in at.button if b.key == f"approve_{username}").click().run())
+
+
+def flow_reject():
+    at, username = _admin_with_request()
+    return timed(lambda: next(b for b in at.button if b.key == f"reject_{username}").click().run())
+
+
+FLOWS = [
+    ("login", flow_login),
+    ("register", flow_register),
+    ("register node", flow_register_node),
+    ("approve signup", flow_approve),
+    ("reject signup", flow_reject),
+]
+
+
+def main():
+    data_dir = tempfile.mkdtemp()
+    os.environ.setdefault("DESCIENCE_LEDGER_PATH", os.path.join(data_dir, "ledger.db"))
+    os.environ.setdefault("DESCIENCE_ACCOUNTS_PATH", os.path.join(data_dir, "accounts.db"))
+    os.environ.setdefault("DESCIENCE_JOBS_PATH", os.path.join(data_dir, "jobs.db"))
+    os.environ.setdefault("DESCIENCE_CHUNKS_PATH", os.path.join(data_dir, "chunks.db"))
+    print(f"{'flow':<16} {'median ms':>10} {'max ms':>10}")
+    for name, flow in FLOWS:
+        samples = [flow() for _ in range(REPEATS)]
+        print(f"{name:<16} {statistics.median(samples) * 1000:10.1f} {max(samples) * 1000:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
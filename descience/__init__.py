@@ -0,0 +1 @@
+# Core De-Science Ledger logic, importable without the Streamlit UI
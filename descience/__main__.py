@@ -0,0 +1,3 @@
+from descience.cli import main
+
+raise SystemExit(main())
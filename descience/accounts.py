@@ -0,0 +1,168 @@
+import os
+
+from descience.db import SQLiteStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password TEXT NOT NULL,
+    name TEXT,
+    email TEXT,
+    role TEXT,
+    institution TEXT,
+    verified INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT,
+    last_login TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_users_email ON users (email);
+CREATE INDEX IF NOT EXISTS idx_users_role ON users (role, username);
+CREATE TABLE IF NOT EXISTS registration_requests (
+    username TEXT PRIMARY KEY,
+    password TEXT NOT NULL,
+    name TEXT,
+    email TEXT,
+    role TEXT,
+    institution TEXT,
+    request_date TEXT,
+    status TEXT NOT NULL DEFAULT 'pending'
+);
+CREATE INDEX IF NOT EXISTS idx_requests_status ON registration_requests (status, request_date);
+CREATE INDEX IF NOT EXISTS idx_requests_email ON registration_requests (email);
+-- Bumped by triggers on every write, from any connection or process, so
+-- readers can cache derived views and cheaply tell when they are stale
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+""" + "".join(
+    f"""
+CREATE TRIGGER IF NOT EXISTS {table}_{event.lower()}_version AFTER {event} ON {table}
+BEGIN UPDATE meta SET value = value + 1 WHERE key = 'version'; END;"""
+    for table in ["users", "registration_requests"]
+    for event in ["INSERT", "UPDATE", "DELETE"]
+)
+
+DEFAULT_ACCOUNTS_PATH = "descience_accounts.db"
+
+USER_FIELDS = ["password", "name", "email", "role", "institution", "verified", "created_at", "last_login"]
+REQUEST_FIELDS = ["username", "password", "name", "email", "role", "institution", "request_date", "status"]
+
+
+def _to_user(row):
+    user = dict(row)
+    user["verified"] = bool(user["verified"])
+    return user
+
+
+# Accounts and signup requests, shared by every session (see SQLiteStore).
+# Requests keep their row once decided, with status approved/rejected.
+class AccountStore(SQLiteStore):
+    schema = SCHEMA
+
+    def __init__(self, path=None, synchronous="FULL"):
+        super().__init__(path or os.getenv("DESCIENCE_ACCOUNTS_PATH", DEFAULT_ACCOUNTS_PATH), synchronous)
+
+    # Insert users (username -> record) that don't exist yet, e.g. demo accounts
+    def seed(self, users):
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                f"INSERT OR IGNORE INTO users (username, {', '.join(USER_FIELDS)}) "
+                f"VALUES (?, {', '.join('?' * len(USER_FIELDS))})",
+                [(username,) + tuple(user.get(f) for f in USER_FIELDS) for username, user in users.items()],
+            )
+
+    def version(self):
+        return self._conn().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    def get_user(self, username):
+        row = self._conn().execute("SELECT * FROM users WHERE username = ?", (username,)).fetchone()
+        return _to_user(row) if row else None
+
+    def set_password(self, username, encoded):
+        conn = self._conn()
+        with conn:
+            conn.execute("UPDATE users SET password = ? WHERE username = ?", (encoded, username))
+
+    def record_login(self, username, timestamp):
+        conn = self._conn()
+        with conn:
+            conn.execute("UPDATE users SET last_login = ? WHERE username = ?", (timestamp, username))
+
+    def count_users(self, role=None):
+        if role is None:
+            return self._conn().execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        return self._conn().execute("SELECT COUNT(*) FROM users WHERE role = ?", (role,)).fetchone()[0]
+
+    # Users ordered by username, optionally restricted to one role
+    def users_page(self, limit=50, offset=0, role=None):
+        if role is None:
+            rows = self._conn().execute(
+                "SELECT * FROM users ORDER BY username LIMIT ? OFFSET ?", (limit, offset)
+            )
+        else:
+            rows = self._conn().execute(
+                "SELECT * FROM users WHERE role = ? ORDER BY username LIMIT ? OFFSET ?", (role, limit, offset)
+            )
+        return [_to_user(r) for r in rows]
+
+    # Queue a signup. Returns False if the username is taken by an account or
+    # by an undecided request; checked and inserted under one write lock.
+    def add_request(self, request):
+        def add(conn):
+            taken = conn.execute(
+                "SELECT 1 FROM users WHERE username = ? "
+                "UNION ALL SELECT 1 FROM registration_requests WHERE username = ? AND status = 'pending'",
+                (request["username"], request["username"]),
+            ).fetchone()
+            if taken:
+                return False
+            conn.execute(
+                f"INSERT OR REPLACE INTO registration_requests ({', '.join(REQUEST_FIELDS)}) "
+                f"VALUES ({', '.join('?' * len(REQUEST_FIELDS))})",
+                tuple(request.get(f, "pending" if f == "status" else None) for f in REQUEST_FIELDS),
+            )
+            return True
+
+        return self._write_transaction(add)
+
+    def count_pending(self):
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM registration_requests WHERE status = 'pending'"
+        ).fetchone()[0]
+
+    # Oldest-first page of undecided signup requests
+    def pending_requests(self, limit=50, offset=0):
+        rows = self._conn().execute(
+            "SELECT * FROM registration_requests WHERE status = 'pending' "
+            "ORDER BY request_date LIMIT ? OFFSET ?",
+            (limit, offset),
+        )
+        return [dict(r) for r in rows]
+
+    # Create the account and close the request in one transaction. Returns False
+    # if the request was already decided (e.g. by another admin meanwhile).
+    def approve(self, username):
+        def approve_request(conn):
+            req = conn.execute(
+                "SELECT * FROM registration_requests WHERE username = ? AND status = 'pending'", (username,)
+            ).fetchone()
+            if req is None:
+                return False
+            conn.execute(
+                "INSERT INTO users (username, password, name, email, role, institution, verified, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, 1, ?)",
+                (req["username"], req["password"], req["name"], req["email"], req["role"],
+                 req["institution"], req["request_date"]),
+            )
+            conn.execute("UPDATE registration_requests SET status = 'approved' WHERE username = ?", (username,))
+            return True
+
+        return self._write_transaction(approve_request)
+
+    def reject(self, username):
+        conn = self._conn()
+        with conn:
+            cursor = conn.execute(
+                "UPDATE registration_requests SET status = 'rejected' WHERE username = ? AND status = 'pending'",
+                (username,),
+            )
+        return cursor.rowcount == 1
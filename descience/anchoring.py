@@ -0,0 +1,129 @@
+import hashlib
+import random
+import time
+import uuid
+from datetime import datetime
+
+from descience.bulk import hash_paths, list_directory
+from descience.merkle import build_tree, inclusion_proof, merkle_root, verify_proof
+from descience.metrics import inc, timed
+
+MERKLE_ROOT_TYPE = "Merkle Root"
+# A pending batch is sealed automatically once it reaches this many files
+MAX_BATCH_SIZE = 1024
+
+
+# Anchoring transaction for a data hash. With a chain backend (see descience.chain)
+# the hash is submitted and the record stays "pending" until a ConfirmationTracker
+# sees its receipt; without one the record is synthetic and confirmed at once.
+def build_anchor_transaction(node, data_hash, filename, data_type="Research Data", chain=None):
+    if chain is not None:
+        transaction_hash, block_number, status = chain.send_anchors([data_hash])[0], None, "pending"
+    else:
+        transaction_hash = f"0x{hashlib.sha256(f'{random.random()}{time.time()}'.encode()).hexdigest()}"
+        block_number, status = random.randint(1000000, 2000000), "confirmed"
+    return {
+        "transaction_hash": transaction_hash,
+        "block_number": block_number,
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "node": node,
+        "data_type": data_type,
+        "data_hash": data_hash,
+        "filename": filename,
+        "status": status
+    }
+
+
+# Roll every pending data hash (or only those queued under batch) into one
+# Merkle tree and anchor only its root. Each file gets a record sharing the
+# root's transaction plus its inclusion proof. The root is submitted outside
+# the ledger's write lock (see seal_pending), and a failed submission leaves
+# the files queued for the next attempt.
+def seal_batch(store, sealed_by, chain=None, batch=None):
+    def build_records(pending):
+        levels = build_tree([p["data_hash"] for p in pending])
+        root = merkle_root(levels)
+        anchor = build_anchor_transaction(
+            sealed_by, root, f"Merkle batch of {len(pending)} files", data_type=MERKLE_ROOT_TYPE, chain=chain
+        )
+        records = [anchor]
+        for i, p in enumerate(pending):
+            records.append({
+                **anchor,
+                "node": p["node"],
+                "data_type": p["data_type"],
+                "data_hash": p["data_hash"],
+                "filename": p["filename"],
+                "merkle_root": root,
+                "merkle_proof": inclusion_proof(levels, i)
+            })
+        return records
+
+    records = store.seal_pending(build_records, batch=batch)
+    if records:
+        inc("anchor_transactions")
+        inc("anchored_files", len(records) - 1)
+    return records
+
+
+# Anchor a bulk run of (name, data_hash, size) results as one Merkle batch of
+# just those files, leaving anything others queued for the shared batch alone
+def anchor_files(store, files, node, chain=None):
+    batch = uuid.uuid4().hex
+    store.add_pending_many([(data_hash, name) for name, data_hash, _ in files], node, batch=batch)
+    return seal_batch(store, node, chain, batch=batch)
+
+
+# Whether a record's chain transaction was mined but reverted
+def anchor_failed(tx):
+    return tx.get("status") == "failed"
+
+
+# Every anchor of a data hash paired with whether it checks out. A record whose
+# transaction failed never anchored anything; batched records must also prove
+# inclusion in a root that is itself anchored on the ledger by a transaction
+# that didn't fail.
+@timed("verify_data_hash")
+def verify_data_hash(store, data_hash):
+    results = []
+    for tx in store.lookup(data_hash):
+        verified = not anchor_failed(tx)
+        if verified and "merkle_proof" in tx:
+            verified = verify_proof(data_hash, tx["merkle_proof"], tx["merkle_root"]) and any(
+                a.get("data_type") == MERKLE_ROOT_TYPE and not anchor_failed(a) for a in store.lookup(tx["merkle_root"])
+            )
+        results.append((tx, verified))
+    return results
+
+
+def _batch_summary(records):
+    if not records:
+        return {"files": 0}
+    return {
+        "files": len(records) - 1,
+        "merkle_root": records[0]["data_hash"],
+        "transaction_hash": records[0]["transaction_hash"],
+    }
+
+
+# Background job handlers (see descience.jobs) for anchoring work:
+#   seal              {"sealed_by"}: seal the pending batch and submit its root
+#   anchor_directory  {"directory", "node"}: hash a server-side directory and
+#                     queue its files, then enqueue a seal job for them
+# Hashing and sealing are separate jobs so a chain outage retries only the
+# submission, never re-queueing files that are already pending.
+def anchoring_job_handlers(store, queue, chain=None):
+    def seal(payload):
+        return _batch_summary(seal_batch(store, payload["sealed_by"], chain))
+
+    def anchor_directory(payload):
+        result = hash_paths(list_directory(payload["directory"]))
+        store.add_pending_many([(data_hash, name) for name, data_hash, _ in result["files"]], payload["node"])
+        return {
+            "files": len(result["files"]),
+            "total_bytes": result["total_bytes"],
+            "seconds": result["seconds"],
+            "seal_job": queue.enqueue("seal", {"sealed_by": payload["node"]}, payload["node"]),
+        }
+
+    return {"seal": seal, "anchor_directory": anchor_directory}
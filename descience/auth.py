@@ -0,0 +1,114 @@
+import re
+from datetime import datetime
+from functools import lru_cache
+
+from descience.metrics import inc
+from descience.passwords import hash_password, verify_password
+
+
+# Validate email format
+def is_valid_email(email):
+    pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
+    return re.match(pattern, email) is not None
+
+
+# Validate password strength
+def is_strong_password(password):
+    if len(password) < 8:
+        return False
+    if not re.search(r'[A-Z]', password):
+        return False
+    if not re.search(r'[a-z]', password):
+        return False
+    if not re.search(r'\d', password):
+        return False
+    return True
+
+
+# Hash that unknown usernames are checked against, so a miss costs a full KDF
+# verify like a wrong password does and login timing doesn't reveal accounts
+@lru_cache(maxsize=None)
+def _dummy_password_hash():
+    return hash_password("descience-unknown-user")
+
+
+# Check credentials against the account store. Records stored with a legacy
+# scheme or an outdated cost are transparently rehashed.
+def authenticate_user(accounts, username, password):
+    user = accounts.get_user(username)
+    if not user:
+        verify_password(password, _dummy_password_hash())
+    else:
+        matches, needs_rehash = verify_password(password, user["password"])
+        if matches:
+            if needs_rehash:
+                accounts.set_password(username, hash_password(password))
+            # Update last login
+            accounts.record_login(username, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            inc("logins")
+            return True
+    inc("login_failures")
+    return False
+
+
+# Validate a signup and queue it in the account store for admin approval
+def register_user(accounts, username, password, name, email, role, institution):
+    if accounts.get_user(username):
+        return False, "Username already exists"
+    
+    if not is_valid_email(email):
+        return False, "Invalid email format"
+    
+    if not is_strong_password(password):
+        return False, "Password must be at least 8 characters with uppercase, lowercase, and numbers"
+    
+    # Add to registration requests (pending approval)
+    request = {
+        "username": username,
+        "password": hash_password(password),
+        "name": name,
+        "email": email,
+        "role": role,
+        "institution": institution,
+        "verified": False,
+        "request_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "status": "pending"
+    }
+    if not accounts.add_request(request):
+        return False, "Username already exists"
+    return True, "Registration submitted for approval"
+
+
+# Demo passwords are hashed once per process rather than once per session
+@lru_cache(maxsize=None)
+def _seed_password_hash(password):
+    return hash_password(password)
+
+
+def _default_user(password, name, email, role, institution):
+    return {
+        "password": _seed_password_hash(password),
+        "name": name,
+        "email": email,
+        "role": role,
+        "institution": institution,
+        "verified": True,
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "last_login": None
+    }
+
+
+# Default users with different roles
+def default_users_db():
+    return {
+        "researcher1": _default_user("research123", "Dr. Sarah Chen", "sarah.chen@research.org",
+                                     "researcher", "Stanford University"),
+        "validator1": _default_user("validate123", "Prof. James Wilson", "j.wilson@blockchain-lab.io",
+                                    "validator", "MIT Blockchain Lab"),
+        "auditor1": _default_user("audit123", "Dr. Maria Garcia", "m.garcia@ethics-board.org",
+                                  "auditor", "Research Ethics Board"),
+        "admin": _default_user("admin123", "System Administrator", "admin@de-science.io",
+                               "admin", "De-Science Foundation"),
+        "demo_user": _default_user("demo123", "Demo Researcher", "demo@example.com",
+                                   "researcher", "Demo University")
+    }
@@ -0,0 +1,93 @@
+import contextlib
+import multiprocessing
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from descience.hashing import sha256_file, sha256_stream
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+# Every regular file under a server-side directory, in a stable order
+def list_directory(directory):
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        paths.extend(os.path.join(root, name) for name in sorted(files))
+    return paths
+
+
+def _hash_path(path):
+    return path, sha256_file(path, use_mmap=True), os.path.getsize(path)
+
+
+def _hash_entry(entry):
+    name, size, opener = entry
+    with opener() as f:
+        return name, sha256_stream(f, total=size), size
+
+
+def _summary(files, started):
+    seconds = time.perf_counter() - started
+    total_bytes = sum(size for _, _, size in files)
+    return {
+        "files": files,
+        "total_bytes": total_bytes,
+        "seconds": seconds,
+        "bytes_per_second": total_bytes / seconds if seconds > 0 else 0.0
+    }
+
+
+# Hash server-side files in a process pool sized to the machine. Workers get
+# paths, not contents, and read via mmap, so nothing large crosses processes.
+def hash_paths(paths, workers=None):
+    started = time.perf_counter()
+    paths = list(paths)
+    if not paths:
+        return _summary([], started)
+    workers = min(workers or default_workers(), len(paths))
+    if workers == 1:
+        # Not worth starting a pool for a single worker
+        return _summary([_hash_path(path) for path in paths], started)
+    # spawn keeps workers clean of the parent's threads (Streamlit runs many)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        chunksize = max(1, len(paths) // (workers * 4))
+        files = list(pool.map(_hash_path, paths, chunksize=chunksize))
+    return _summary(files, started)
+
+
+# Hash in-memory files (uploads, zip members) given as (name, size, opener)
+# entries, where opener() returns a context manager yielding a binary file.
+# hashlib releases the GIL on large buffers, so threads hash in parallel
+# without pickling every file's bytes into a worker process.
+def hash_entries(entries, workers=None):
+    started = time.perf_counter()
+    entries = list(entries)
+    if not entries:
+        return _summary([], started)
+    with ThreadPoolExecutor(max_workers=min(workers or default_workers(), len(entries))) as pool:
+        files = list(pool.map(_hash_entry, entries))
+    return _summary(files, started)
+
+
+# Hashing entries for uploaded files; zip archives are expanded into their members
+def upload_entries(uploaded_files):
+    entries = []
+    for uploaded in uploaded_files:
+        if uploaded.name.lower().endswith(".zip"):
+            archive = zipfile.ZipFile(uploaded)
+            for info in archive.infolist():
+                if not info.is_dir():
+                    entries.append((
+                        f"{uploaded.name}/{info.filename}",
+                        info.file_size,
+                        lambda archive=archive, info=info: archive.open(info)
+                    ))
+        else:
+            entries.append((uploaded.name, uploaded.size, lambda f=uploaded: contextlib.nullcontext(f)))
+    return entries
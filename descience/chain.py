@@ -0,0 +1,223 @@
+import itertools
+import os
+import threading
+import time
+import traceback
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from descience.metrics import timed
+
+# Anchoring backends. An anchor is a zero-value transaction whose calldata is
+# the data hash (or Merkle root). send_anchors() returns as soon as the node
+# has accepted the transactions; ConfirmationTracker then polls for receipts in
+# the background and marks ledger records confirmed.
+
+# Gas for a 32-byte-calldata transfer (21000 + 32 * 16) with headroom for a contract call
+GAS_LIMIT = 60_000
+# Receipts requested per batched JSON-RPC call
+RECEIPT_BATCH_SIZE = 500
+
+
+class ChainError(Exception):
+    pass
+
+
+# Client for an Ethereum JSON-RPC node. Requests go through one pooled
+# keep-alive session, and multi-call operations are sent as a single JSON-RPC
+# batch (one HTTP round trip). Nonces are assigned locally and resynced from
+# the node after an error. With private_key, transactions are signed here and
+# sent raw; otherwise the node must manage sender (e.g. a dev node's unlocked account).
+class JsonRpcChain:
+    def __init__(self, url, sender=None, private_key=None, to=None, pool_size=8, timeout=10):
+        self.url = url
+        self.timeout = timeout
+        self.private_key = private_key
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._nonce = None
+        self._chain_id = None
+        if private_key and sender is None:
+            from eth_account import Account
+            sender = Account.from_key(private_key).address
+        self._sender = sender
+        self.to = to
+
+    def _post(self, payload):
+        try:
+            response = self.session.post(self.url, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+        except (requests.RequestException, ValueError) as e:
+            raise ChainError(f"{self.url}: {e}") from e
+
+    def call(self, method, *params):
+        return self.batch([(method, list(params))])[0]
+
+    # Send [(method, params), ...] as one JSON-RPC batch; results come back in call order
+    def batch(self, calls):
+        if not calls:
+            return []
+        payload = [{"jsonrpc": "2.0", "id": next(self._ids), "method": m, "params": p} for m, p in calls]
+        responses = self._post(payload)
+        if isinstance(responses, dict):
+            # Some nodes answer a rejected batch with a single error object
+            responses = [responses]
+        by_id = {r.get("id"): r for r in responses}
+        results = []
+        for request in payload:
+            response = by_id.get(request["id"])
+            if response is None:
+                raise ChainError(f"no response to {request['method']}")
+            if response.get("error"):
+                raise ChainError(f"{request['method']}: {response['error'].get('message', response['error'])}")
+            results.append(response.get("result"))
+        return results
+
+    @property
+    def sender(self):
+        if self._sender is None:
+            accounts = self.call("eth_accounts")
+            if not accounts:
+                raise ChainError("node has no unlocked accounts; configure a sender or private key")
+            self._sender = accounts[0]
+        return self._sender
+
+    def _signed(self, data_hashes, nonce):
+        from eth_account import Account
+        if self._chain_id is None:
+            self._chain_id = int(self.call("eth_chainId"), 16)
+        gas_price = int(self.call("eth_gasPrice"), 16)
+        raw = []
+        for i, data_hash in enumerate(data_hashes):
+            signed = Account.sign_transaction({
+                "to": self.to or self.sender,
+                "value": 0,
+                "data": "0x" + data_hash,
+                "nonce": nonce + i,
+                "gas": GAS_LIMIT,
+                "gasPrice": gas_price,
+                "chainId": self._chain_id,
+            }, self.private_key)
+            raw.append(("eth_sendRawTransaction", ["0x" + signed.raw_transaction.hex().removeprefix("0x")]))
+        return raw
+
+    # Submit one anchor per data hash in a single batch; returns their transaction hashes.
+    # The lock keeps nonces contiguous when several sessions anchor at once.
+    @timed("chain.send_anchors")
+    def send_anchors(self, data_hashes):
+        with self._lock:
+            sender = self.sender
+            if self._nonce is None:
+                self._nonce = int(self.call("eth_getTransactionCount", sender, "pending"), 16)
+            if self.private_key:
+                calls = self._signed(data_hashes, self._nonce)
+            else:
+                calls = [("eth_sendTransaction", [{
+                    "from": sender,
+                    "to": self.to or sender,
+                    "value": "0x0",
+                    "gas": hex(GAS_LIMIT),
+                    "data": "0x" + data_hash,
+                    "nonce": hex(self._nonce + i),
+                }]) for i, data_hash in enumerate(data_hashes)]
+            try:
+                tx_hashes = self.batch(calls)
+            except ChainError:
+                # Part of the batch may have gone through; ask the node next time
+                self._nonce = None
+                raise
+            self._nonce += len(tx_hashes)
+            return tx_hashes
+
+    # Receipts that have arrived, as (transaction_hash, block_number, succeeded) triples
+    @timed("chain.receipts")
+    def receipts(self, tx_hashes):
+        found = []
+        for start in range(0, len(tx_hashes), RECEIPT_BATCH_SIZE):
+            chunk = tx_hashes[start:start + RECEIPT_BATCH_SIZE]
+            results = self.batch([("eth_getTransactionReceipt", [h]) for h in chunk])
+            for tx_hash, receipt in zip(chunk, results):
+                if receipt and receipt.get("blockNumber"):
+                    found.append((tx_hash, int(receipt["blockNumber"], 16), receipt.get("status") != "0x0"))
+        return found
+
+    def close(self):
+        self.session.close()
+
+
+# Polls the chain for receipts of the ledger's pending records and marks them
+# confirmed. One tracker per process is enough; confirming is idempotent, so
+# several processes sharing a ledger can each run one.
+class ConfirmationTracker:
+    def __init__(self, store, chain, interval=1.0):
+        self.store = store
+        self.chain = chain
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    # One pass: returns the number of chain transactions newly confirmed
+    def poll(self):
+        pending = self.store.unconfirmed()
+        if not pending:
+            return 0
+        receipts = self.chain.receipts(pending)
+        if receipts:
+            self.store.confirm(receipts)
+        return len(receipts)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except ChainError:
+                # Node unreachable: keep the records pending and try again next interval
+                pass
+            except Exception:
+                # A locked database or a malformed receipt must not end the thread,
+                # or every later anchor would stay pending until a restart
+                traceback.print_exc()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="confirmation-tracker", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    # Block until the given transactions have receipts or timeout passes;
+    # returns the ones still pending (a hash not on the ledger isn't)
+    def wait(self, tx_hashes, timeout=30):
+        deadline = time.monotonic() + timeout
+        waiting = set(tx_hashes)
+        while waiting:
+            self.poll()
+            waiting = {h for h in waiting if (self.store.transaction_status(h) or (None,))[0] == "pending"}
+            if not waiting or time.monotonic() >= deadline:
+                break
+            time.sleep(min(self.interval, 0.2))
+        return waiting
+
+
+# Backend named by DESCIENCE_RPC_URL: a node URL, or "local" (the default) for an
+# in-process LocalChain stand-in. DESCIENCE_PRIVATE_KEY and DESCIENCE_ANCHOR_TO
+# set the signing key and the anchor recipient (default: the sender itself).
+def connect_chain(url=None):
+    url = url or os.getenv("DESCIENCE_RPC_URL", "local")
+    if url == "local":
+        from descience.localchain import LocalChain
+        url = LocalChain().start().url
+    return JsonRpcChain(
+        url,
+        private_key=os.getenv("DESCIENCE_PRIVATE_KEY") or None,
+        to=os.getenv("DESCIENCE_ANCHOR_TO") or None,
+    )
@@ -0,0 +1,235 @@
+import hashlib
+import os
+from array import array
+from datetime import datetime
+
+import numpy as np
+
+from descience.db import SQLiteStore
+from descience.hashing import CHUNK_SIZE
+from descience.metrics import inc, timed
+
+# Content-defined chunking. Chunk boundaries fall where a hash of the
+# WINDOW bytes before them hits a target, so an edit only moves the boundaries
+# near it: a new version of a dataset shares every untouched chunk with the old
+# one. Chunks are between MIN_CHUNK and MAX_CHUNK bytes, AVG_CHUNK on average.
+MIN_CHUNK = 16 * 1024
+AVG_CHUNK = 64 * 1024
+MAX_CHUNK = 256 * 1024
+WINDOW = 8
+
+# The window hash is a multiplicative (Fibonacci) hash of the 8 bytes read as
+# one uint64. NumPy views the block as overlapping uint64s (byte stride), so a
+# whole block is hashed in one vectorized multiply instead of a Python loop per
+# byte. The high bits of the product depend on every byte of the window.
+_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+# A position is a boundary candidate with probability 1 / (AVG_CHUNK - MIN_CHUNK),
+# which puts the average chunk at AVG_CHUNK once MIN_CHUNK is skipped
+_THRESHOLD = np.uint64(2**64 // (AVG_CHUNK - MIN_CHUNK))
+
+
+# Positions i (relative to data) whose window ending at data[i] is a boundary
+# candidate, i.e. a cut could go right after byte i
+def _candidates(data):
+    if len(data) < WINDOW:
+        return np.empty(0, dtype=np.int64)
+    windows = np.ndarray(shape=(len(data) - WINDOW + 1,), dtype=np.uint64, buffer=data, strides=(1,))
+    return np.flatnonzero(windows * _MULTIPLIER < _THRESHOLD) + (WINDOW - 1)
+
+
+# Split a binary file-like object into content-defined chunks while computing
+# its SHA-256, in one streaming read. Returns the file digest, size and the
+# chunks as (offset, size, sha256 hex) tuples. progress(done, total) as in sha256_stream.
+@timed("hash.chunk_stream")
+def chunk_stream(fileobj, total=None, progress=None, block_size=CHUNK_SIZE):
+    digest = hashlib.sha256()
+    chunks = []
+    tail = bytearray()  # bytes after the last cut
+    tail_offset = 0
+    carry = b""  # last WINDOW - 1 bytes read, so windows span block edges
+    pending = np.empty(0, dtype=np.int64)  # candidate cut offsets after the last cut
+    done = 0
+    fileobj.seek(0)
+
+    def cut(end):
+        nonlocal tail_offset
+        size = end - tail_offset
+        chunks.append((tail_offset, size, hashlib.sha256(memoryview(tail)[:size]).hexdigest()))
+        del tail[:size]
+        tail_offset = end
+
+    while True:
+        block = fileobj.read(block_size)
+        if not block:
+            break
+        digest.update(block)
+        window_data = carry + block
+        base = done - len(carry)
+        pending = np.concatenate([pending, _candidates(window_data) + base + 1])
+        carry = window_data[-(WINDOW - 1):]
+        tail += block
+        done += len(block)
+        while True:
+            lowest = tail_offset + MIN_CHUNK
+            pending = pending[np.searchsorted(pending, lowest):]
+            limit = tail_offset + MAX_CHUNK
+            if len(pending) and pending[0] <= limit:
+                cut(int(pending[0]))
+            elif limit <= done:
+                cut(limit)
+            else:
+                break
+        if progress:
+            progress(done, total)
+    if tail:
+        cut(done)
+    fileobj.seek(0)
+    inc("bytes_hashed", done)
+    return {"digest": digest.hexdigest(), "size": done, "chunks": chunks}
+
+
+def chunk_file(path, progress=None):
+    with open(path, "rb") as f:
+        return chunk_stream(f, total=os.path.getsize(path), progress=progress)
+
+
+# Compare a file's chunks with a stored manifest [(sha256 hex, size)]. Returns
+# the byte ranges of the file that are not in the manifest, merged where
+# adjacent, plus how much of the file and of the manifest was reused.
+def diff_chunks(chunks, manifest):
+    known = {digest for digest, _ in manifest}
+    changed = []
+    unchanged_bytes = 0
+    for offset, size, digest in chunks:
+        if digest in known:
+            unchanged_bytes += size
+        elif changed and changed[-1][0] + changed[-1][1] == offset:
+            changed[-1] = (changed[-1][0], changed[-1][1] + size)
+        else:
+            changed.append((offset, size))
+    current = {digest for _, _, digest in chunks}
+    return {
+        "changed": changed,
+        "unchanged_chunks": sum(1 for _, _, digest in chunks if digest in known),
+        "unchanged_bytes": unchanged_bytes,
+        "removed_chunks": sum(1 for digest, _ in manifest if digest not in current),
+    }
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY,
+    digest BLOB NOT NULL UNIQUE,
+    size INTEGER NOT NULL
+);
+-- One manifest per distinct file digest: its chunk ids in order, packed as int64s
+CREATE TABLE IF NOT EXISTS manifests (
+    data_hash TEXT PRIMARY KEY,
+    filename TEXT,
+    size INTEGER,
+    chunk_count INTEGER,
+    new_chunks INTEGER,
+    chunk_ids BLOB NOT NULL,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_manifests_filename ON manifests (filename, created_at);
+"""
+
+DEFAULT_CHUNKS_PATH = "descience_chunks.db"
+
+# Host parameters per IN (...) query, under SQLite's default limit
+_IN_BATCH = 500
+
+
+# Chunk digests and per-file manifests, shared like the other stores (see
+# SQLiteStore). A chunk digest is stored once however many versions contain it,
+# so an incremental version costs one row per new chunk plus 8 bytes per chunk.
+class ChunkStore(SQLiteStore):
+    schema = SCHEMA
+
+    def __init__(self, path=None, synchronous="FULL"):
+        super().__init__(path or os.getenv("DESCIENCE_CHUNKS_PATH", DEFAULT_CHUNKS_PATH), synchronous)
+
+    @staticmethod
+    def _ids(conn, digests):
+        ids = {}
+        for i in range(0, len(digests), _IN_BATCH):
+            batch = digests[i:i + _IN_BATCH]
+            rows = conn.execute(
+                f"SELECT id, digest FROM chunks WHERE digest IN ({', '.join('?' * len(batch))})", batch
+            )
+            ids.update((bytes(r["digest"]), r["id"]) for r in rows)
+        return ids
+
+    # How many of the given chunks are already stored
+    def known_count(self, chunks):
+        digests = list({bytes.fromhex(digest) for _, _, digest in chunks})
+        return len(self._ids(self._conn(), digests))
+
+    # Store the manifest of a file (a chunk_stream result) and any chunks not
+    # seen before. Returns the number of new chunks; 0 if the file was known.
+    def record(self, data_hash, filename, chunks):
+        def add(conn):
+            if conn.execute("SELECT 1 FROM manifests WHERE data_hash = ?", (data_hash,)).fetchone():
+                return 0
+            digests = [bytes.fromhex(digest) for _, _, digest in chunks]
+            ids = self._ids(conn, list(set(digests)))
+            new = {}
+            for digest, (_, size, _) in zip(digests, chunks):
+                if digest not in ids and digest not in new:
+                    new[digest] = size
+            conn.executemany("INSERT INTO chunks (digest, size) VALUES (?, ?)", new.items())
+            ids.update(self._ids(conn, list(new)))
+            conn.execute(
+                "INSERT INTO manifests (data_hash, filename, size, chunk_count, new_chunks, chunk_ids, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (data_hash, filename, sum(size for _, size, _ in chunks), len(chunks), len(new),
+                 array("q", (ids[d] for d in digests)).tobytes(), datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+            )
+            return len(new)
+
+        return self._write_transaction(add)
+
+    # Changes whenever a manifest is added
+    def version(self):
+        return self._conn().execute("SELECT COALESCE(MAX(rowid), 0) FROM manifests").fetchone()[0]
+
+    def manifest_info(self, data_hash):
+        row = self._conn().execute(
+            "SELECT data_hash, filename, size, chunk_count, new_chunks, created_at FROM manifests WHERE data_hash = ?",
+            (data_hash,),
+        ).fetchone()
+        return dict(row) if row else None
+
+    # Chunks of a stored file in order, as (sha256 hex, size) pairs, or None
+    def manifest(self, data_hash):
+        row = self._conn().execute("SELECT chunk_ids FROM manifests WHERE data_hash = ?", (data_hash,)).fetchone()
+        if row is None:
+            return None
+        ids = array("q")
+        ids.frombytes(row["chunk_ids"])
+        by_id = {}
+        unique = list(set(ids))
+        for i in range(0, len(unique), _IN_BATCH):
+            batch = unique[i:i + _IN_BATCH]
+            rows = self._conn().execute(
+                f"SELECT id, digest, size FROM chunks WHERE id IN ({', '.join('?' * len(batch))})", batch
+            )
+            by_id.update((r["id"], (bytes(r["digest"]).hex(), r["size"])) for r in rows)
+        return [by_id[i] for i in ids]
+
+    # The stored version of filename sharing the most chunks with the given
+    # ones (other than the file itself), with its diff; None if there is none.
+    # Sensor stations re-upload under the same name, so only those are compared.
+    def closest_version(self, filename, chunks, data_hash=None, candidates=5):
+        rows = self._conn().execute(
+            "SELECT data_hash FROM manifests WHERE filename = ? AND data_hash != ? "
+            "ORDER BY created_at DESC LIMIT ?",
+            (filename, data_hash or "", candidates),
+        ).fetchall()
+        best = None
+        for row in rows:
+            diff = diff_chunks(chunks, self.manifest(row["data_hash"]))
+            if best is None or diff["unchanged_bytes"] > best[1]["unchanged_bytes"]:
+                best = (self.manifest_info(row["data_hash"]), diff)
+        return best
@@ -0,0 +1,185 @@
+import argparse
+import getpass
+import json
+import os
+import sys
+import time
+
+from descience.anchoring import anchor_failed, anchor_files, anchoring_job_handlers, verify_data_hash
+from descience.bulk import hash_paths, list_directory
+from descience.hashing import sha256_file
+from descience.jobs import JobQueue, JobWorkers
+from descience.ledger import LedgerStore
+from descience.metrics import start_exporters
+
+
+def _expand(paths):
+    files = []
+    for path in paths:
+        files.extend(list_directory(path) if os.path.isdir(path) else [path])
+    return files
+
+
+# Chain support pulls in requests, so only anchor and worker load it
+def cmd_anchor(args):
+    from descience.chain import ChainError, ConfirmationTracker, connect_chain
+    paths = _expand(args.paths)
+    missing = [p for p in paths if not os.path.isfile(p)]
+    if missing:
+        print(f"error: not a file: {missing[0]}", file=sys.stderr)
+        return 2
+    if not paths:
+        print("error: no files to anchor", file=sys.stderr)
+        return 2
+    result = hash_paths(paths, workers=args.workers)
+    store = LedgerStore(args.ledger)
+    chain = connect_chain(args.rpc)
+    try:
+        records = anchor_files(store, result["files"], args.node, chain)
+    except ChainError as e:
+        print(f"error: could not submit the anchor (files left queued): {e}", file=sys.stderr)
+        return 1
+    if not records:
+        print("error: nothing was sealed; another sealer took over this run's files", file=sys.stderr)
+        return 2
+    for path, data_hash, _ in result["files"]:
+        print(f"{data_hash}  {path}")
+    tx_hash = records[0]["transaction_hash"]
+    print(
+        f"anchored {len(records) - 1} file(s) under Merkle root {records[0]['data_hash']} in tx {tx_hash} "
+        f"({result['total_bytes'] / 1024 / 1024:.1f} MB at "
+        f"{result['bytes_per_second'] / 1024 / 1024:.1f} MB/s)",
+        file=sys.stderr,
+    )
+    if args.wait:
+        still_pending = ConfirmationTracker(store, chain).wait([tx_hash], timeout=args.wait)
+        if still_pending and (args.rpc or os.getenv("DESCIENCE_RPC_URL", "local")) == "local":
+            print(f"not confirmed after {args.wait:g}s; the in-process local chain stops with this command, "
+                  f"so the record stays pending", file=sys.stderr)
+        elif still_pending:
+            print(f"not confirmed after {args.wait:g}s; the record stays pending until an app or "
+                  f"`descience worker` on this ledger and chain sees its receipt", file=sys.stderr)
+        else:
+            print(f"confirmed in block {store.transaction_status(tx_hash)[1]}", file=sys.stderr)
+    store.close()
+    chain.close()
+    return 0
+
+
+def cmd_verify(args):
+    if not os.path.isfile(args.path):
+        print(f"error: not a file: {args.path}", file=sys.stderr)
+        return 2
+    data_hash = sha256_file(args.path, use_mmap=True)
+    store = LedgerStore(args.ledger)
+    results = verify_data_hash(store, data_hash)
+    store.close()
+    verified = [tx for tx, ok in results if ok]
+    if args.json:
+        failed = any(anchor_failed(tx) for tx, _ in results)
+        print(json.dumps({"data_hash": data_hash, "verified": bool(verified), "anchor_failed": failed and not verified,
+                          "anchors": verified}, indent=2))
+    elif verified:
+        print(f"verified: {data_hash} anchored in {len(verified)} record(s), first at {verified[0]['timestamp']}")
+    elif any(anchor_failed(tx) for tx, _ in results):
+        print(f"failed: {data_hash} has a record but its anchor transaction failed on chain")
+    elif results:
+        print(f"invalid: {data_hash} has a record but its Merkle proof does not match an anchored root")
+    else:
+        print(f"not found: {data_hash}")
+    return 0 if verified else 1
+
+
+# Drain the background job queue the app fills (run the app with DESCIENCE_JOB_WORKERS=0)
+def cmd_worker(args):
+    from descience.chain import ConfirmationTracker, connect_chain
+    store = LedgerStore(args.ledger)
+    chain = connect_chain(args.rpc)
+    ConfirmationTracker(store, chain).start()
+    queue = JobQueue(args.jobs)
+    workers = JobWorkers(queue, anchoring_job_handlers(store, queue, chain), workers=args.threads).start()
+    start_exporters()
+    print(f"{args.threads} worker thread(s) draining {queue.path}; Ctrl+C to stop", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        workers.stop()
+    return 0
+
+
+# pyarrow is only needed by export/import, so anchor and verify don't pay for loading it
+def cmd_export(args):
+    from descience.columnar import export_ledger
+    store = LedgerStore(args.ledger)
+    rows = export_ledger(store, args.path)
+    store.close()
+    print(f"exported {rows} transaction(s) to {args.path}", file=sys.stderr)
+    return 0
+
+
+def cmd_import(args):
+    from descience.columnar import import_ledger
+    store = LedgerStore(args.ledger)
+    rows = import_ledger(store, args.path)
+    store.close()
+    print(f"imported {rows} transaction(s) from {args.path}", file=sys.stderr)
+    return 0
+
+
+# Report files a node produced to the app's telemetry endpoint (DESCIENCE_TELEMETRY_PORT)
+def cmd_push(args):
+    import requests
+    events = [{"node": args.node, "bytes": os.path.getsize(path), "points": args.points} for path in _expand(args.paths)]
+    response = requests.post(f"{args.url.rstrip('/')}/events", json=events, timeout=10)
+    response.raise_for_status()
+    result = response.json()
+    print(f"{result['accepted']} event(s) accepted, {result['rejected']} rejected", file=sys.stderr)
+    return 0 if result["accepted"] == len(events) else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="descience", description="Anchor and verify research data without the web UI")
+    parser.add_argument("--ledger", default=None, help="ledger database path (default: $DESCIENCE_LEDGER_PATH or ./descience_ledger.db)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    anchor = commands.add_parser("anchor", help="hash files (or directories) and anchor them as one Merkle batch")
+    anchor.add_argument("paths", nargs="+")
+    anchor.add_argument("--node", default=os.getenv("DESCIENCE_NODE") or getpass.getuser(), help="submitter recorded on the ledger")
+    anchor.add_argument("--workers", type=int, default=None, help="hashing processes (default: one per core)")
+    anchor.add_argument("--rpc", default=None, help="JSON-RPC node URL, or 'local' for an in-process stand-in chain (default: $DESCIENCE_RPC_URL or local)")
+    anchor.add_argument("--wait", type=float, default=30, metavar="SECONDS", help="wait this long for confirmation; 0 to return once submitted")
+    anchor.set_defaults(func=cmd_anchor)
+
+    verify = commands.add_parser("verify", help="check whether a file is anchored; exits 1 if not")
+    verify.add_argument("path")
+    verify.add_argument("--json", action="store_true", help="print the matching records as JSON")
+    verify.set_defaults(func=cmd_verify)
+
+    worker = commands.add_parser("worker", help="run background anchoring jobs queued by the app")
+    worker.add_argument("--jobs", default=None, help="job queue database path (default: $DESCIENCE_JOBS_PATH or ./descience_jobs.db)")
+    worker.add_argument("--threads", type=int, default=2, help="jobs run concurrently")
+    worker.add_argument("--rpc", default=None, help="JSON-RPC node URL (default: $DESCIENCE_RPC_URL or local)")
+    worker.set_defaults(func=cmd_worker)
+
+    push = commands.add_parser("push", help="report submitted files to the app's node telemetry")
+    push.add_argument("paths", nargs="+")
+    push.add_argument("--node", required=True, help="research node id, e.g. NODE-001")
+    push.add_argument("--points", type=int, default=1, help="data points per file")
+    push.add_argument("--url", default=os.getenv("DESCIENCE_TELEMETRY_URL", "http://127.0.0.1:9470"),
+                      help="telemetry endpoint (default: $DESCIENCE_TELEMETRY_URL or http://127.0.0.1:9470)")
+    push.set_defaults(func=cmd_push)
+
+    export = commands.add_parser("export", help="write the whole ledger to a .parquet or .arrow file")
+    export.add_argument("path")
+    export.set_defaults(func=cmd_export)
+
+    import_ = commands.add_parser("import", help="append the transactions in a .parquet or .arrow export to the ledger")
+    import_.add_argument("path")
+    import_.set_defaults(func=cmd_import)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,145 @@
+import json
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from descience.ledger import COLUMNS
+
+# Bulk export/import of the ledger and node registry for analytics.
+# ".parquet" files are compressed and compact; ".arrow"/".feather" files are
+# uncompressed Arrow IPC, which load_table memory-maps so reads are zero-copy.
+# Exports are written one batch at a time, so a large ledger is never held in RAM.
+
+LEDGER_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("transaction_hash", pa.string()),
+    ("block_number", pa.int64()),
+    ("timestamp", pa.string()),
+    ("node", pa.string()),
+    ("data_type", pa.string()),
+    ("data_hash", pa.string()),
+    ("filename", pa.string()),
+    ("status", pa.string()),
+    # Merkle root/proof and any other per-record keys, as the ledger stores them
+    ("extra", pa.string()),
+])
+
+NODE_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("name", pa.string()),
+    ("type", pa.string()),
+    ("location", pa.string()),
+    ("status", pa.string()),
+    ("last_submission", pa.string()),
+    ("data_points", pa.int64()),
+    ("verified", pa.bool_()),
+    ("node_address", pa.string()),
+    ("stake", pa.float64()),
+    ("owner", pa.string()),
+    ("extra", pa.string()),
+])
+
+NODE_FIELDS = [name for name in NODE_SCHEMA.names if name != "extra"]
+
+BATCH_SIZE = 10_000
+
+
+def _is_ipc(path):
+    return os.path.splitext(str(path))[1].lower() in (".arrow", ".feather", ".ipc")
+
+
+# Context manager writing record batches to path in the format its extension picks
+class _BatchWriter:
+    def __init__(self, path, schema):
+        if _is_ipc(path):
+            self._writer = pa.ipc.new_file(path, schema)
+        else:
+            self._writer = pq.ParquetWriter(path, schema, compression="zstd")
+
+    def write(self, batch):
+        self._writer.write_batch(batch)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._writer.close()
+
+
+# Record batches of a file written by this module, read one at a time
+def iter_batches(path, batch_size=BATCH_SIZE):
+    if _is_ipc(path):
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i)
+    else:
+        yield from pq.ParquetFile(path).iter_batches(batch_size=batch_size)
+
+
+# Whole file as an Arrow table (memory-mapped where the format allows);
+# call .to_pandas() on the result for DataFrame analysis
+def load_table(path, columns=None):
+    if _is_ipc(path):
+        with pa.memory_map(str(path)) as source:
+            table = pa.ipc.open_file(source).read_all()
+        return table.select(columns) if columns else table
+    return pq.read_table(path, columns=columns, memory_map=True)
+
+
+# Stream every ledger transaction, oldest first, to path. Returns the row count.
+def export_ledger(store, path, batch_size=BATCH_SIZE):
+    rows = 0
+    with _BatchWriter(path, LEDGER_SCHEMA) as writer:
+        for chunk in store.scan(batch_size):
+            columns = {name: [r[name] for r in chunk] for name in LEDGER_SCHEMA.names}
+            writer.write(pa.RecordBatch.from_pydict(columns, schema=LEDGER_SCHEMA))
+            rows += len(chunk)
+    return rows
+
+
+# Append every transaction in an exported file to the ledger, one commit per
+# batch. Ledger ids are reassigned; the exported order is kept. Returns the row count.
+def import_ledger(store, path, batch_size=BATCH_SIZE):
+    rows = 0
+    for batch in iter_batches(path, batch_size):
+        columns = [batch.column(name).to_pylist() for name in COLUMNS + ["extra"]]
+        store.append_rows(list(zip(*columns)))
+        rows += batch.num_rows
+    return rows
+
+
+def _node_row(node):
+    extra = {k: v for k, v in node.items() if k not in NODE_FIELDS}
+    return [node.get(f) for f in NODE_FIELDS] + [json.dumps(extra) if extra else None]
+
+
+# Write the node registry to path. Returns the node count.
+def export_nodes(registry, path, batch_size=BATCH_SIZE):
+    nodes = registry.snapshot()
+    with _BatchWriter(path, NODE_SCHEMA) as writer:
+        for start in range(0, len(nodes), batch_size):
+            columns = list(zip(*(_node_row(n) for n in nodes[start:start + batch_size])))
+            writer.write(pa.RecordBatch.from_arrays(
+                [pa.array(col, type=field.type) for col, field in zip(columns, NODE_SCHEMA)],
+                schema=NODE_SCHEMA,
+            ))
+    return len(nodes)
+
+
+# Add nodes from an exported file to the registry, skipping ids it already
+# has. Returns the number of nodes added.
+def import_nodes(registry, path, batch_size=BATCH_SIZE):
+    added = 0
+    for batch in iter_batches(path, batch_size):
+        for row in batch.to_pylist():
+            extra = row.pop("extra")
+            if extra:
+                row.update(json.loads(extra))
+            with registry.lock:
+                if row["id"] in registry:
+                    continue
+                registry.add(row)
+            added += 1
+    return added
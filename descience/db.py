@@ -0,0 +1,59 @@
+import sqlite3
+import threading
+import weakref
+
+
+# sqlite3.Connection itself can't be weakly referenced; a subclass can
+class _Connection(sqlite3.Connection):
+    pass
+
+
+# Base for the SQLite-backed stores. The database runs in WAL mode so readers
+# never block the writer; each thread gets its own connection, so one store
+# object can be shared by every Streamlit session, and other processes can
+# open the same file concurrently. A connection lives only as long as its
+# thread: Streamlit runs every rerun on a new thread, so the store keeps just
+# weak references and the connection closes when the thread's locals go.
+class SQLiteStore:
+    schema = ""
+
+    def __init__(self, path, synchronous="FULL"):
+        self.path = path
+        self.synchronous = synchronous
+        self._local = threading.local()
+        self._connections = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._conn().executescript(self.schema)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, factory=_Connection)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            # FULL fsyncs the WAL on every commit, so an acknowledged write survives power loss
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.add(conn)
+        return conn
+
+    # Run fn(conn) inside a write transaction taken up front (BEGIN IMMEDIATE),
+    # so read-check-write sequences can't interleave with other writers
+    def _write_transaction(self, fn):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(conn)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        return result
+
+    def close(self):
+        with self._lock:
+            for conn in list(self._connections):
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
@@ -0,0 +1,49 @@
+import numpy as np
+
+# Server-side downsampling for time-series charts: pick a few hundred of the
+# points of a long series so the browser gets a small payload that still
+# shows the shape, peaks included. Both return the indices of the kept
+# points, in order, so the caller can select x labels and y values alike.
+
+
+# Largest-Triangle-Three-Buckets (Steinarsson, 2013). The first and last points
+# are kept; every bucket in between contributes the point forming the largest
+# triangle with the previously kept point and the average of the next bucket.
+def lttb(y, threshold, x=None):
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64)
+    # threshold - 2 buckets over the points between the first and the last
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(areas))
+        kept[i + 1] = a
+    return kept
+
+
+# Min/max bucketing: the lowest and highest point of each of `buckets` equal
+# slices, plus both ends. Fully vectorized, and no spike is ever dropped.
+def minmax(y, buckets):
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if 2 * buckets + 2 >= n or buckets < 1:
+        return np.arange(n)
+    bucket = np.arange(n) * buckets // n
+    # Sorted by bucket, then value: each bucket's first entry is its min, its last its max
+    order = np.lexsort((y, bucket))
+    starts = np.searchsorted(bucket[order], np.arange(buckets))
+    ends = np.append(starts[1:], n) - 1
+    return np.unique(np.concatenate([[0, n - 1], order[starts], order[ends]]))
@@ -0,0 +1,94 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from descience.nodes import SUBMISSION_FIELDS
+
+
+# Memoizes values derived from versioned data. get() recomputes only when the
+# key's stored version differs from the current one, so an unchanged rerun is
+# a dict lookup. LRU-bounded and safe to share between sessions.
+class VersionedMemo:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version, compute):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                return entry[1]
+        value = compute()
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+
+# Column-oriented copy of a NodeRegistry that grows by appending new nodes;
+# it is rebuilt only when existing nodes were updated, and when only
+# telemetry moved just the submission columns are refreshed. DataFrames and
+# aggregates are memoized on the registry version and submissions counter.
+class NodeFrames:
+    def __init__(self, registry):
+        self.registry = registry
+        self._columns = {}
+        self._rows = 0
+        self._updates = None
+        self._version = None
+        self._submissions = None
+        self._frame = None
+        self._memo = VersionedMemo()
+        self._lock = threading.Lock()
+
+    def _append(self, nodes):
+        for node in nodes:
+            for key in node.keys() - self._columns.keys():
+                self._columns[key] = [None] * self._rows
+            for key, column in self._columns.items():
+                column.append(node.get(key))
+            self._rows += 1
+
+    def _sync(self):
+        registry = self.registry
+        with registry.lock:
+            if self._frame is not None and self._version == registry.version:
+                # Telemetry only: swap the two submission columns into a shallow
+                # copy, leaving the frame other sessions may be reading untouched
+                nodes = registry.nodes
+                frame = self._frame.copy(deep=False)
+                for key in SUBMISSION_FIELDS:
+                    self._columns[key] = [node.get(key) for node in nodes]
+                    frame[key] = self._columns[key]
+            else:
+                if self._updates != registry.updates:
+                    self._columns, self._rows = {}, 0
+                    self._updates = registry.updates
+                elif self._submissions != registry.submissions:
+                    # Telemetry moved nodes already copied, as well as adding new ones
+                    for key in SUBMISSION_FIELDS:
+                        if key in self._columns:
+                            self._columns[key] = [node.get(key) for node in registry.nodes[:self._rows]]
+                self._append(registry.nodes[self._rows:])
+                # pandas copies the lists into arrays, so later appends don't leak in
+                frame = pd.DataFrame(self._columns)
+            self._frame, self._version, self._submissions = frame, registry.version, registry.submissions
+            return frame
+
+    def _key(self):
+        return self.registry.version, self.registry.submissions
+
+    def frame(self):
+        def build():
+            with self._lock:
+                return self._sync()
+        return self._memo.get("frame", self._key(), build)
+
+    # Memoized aggregate of the node frame, e.g. value counts for a chart
+    def aggregate(self, name, compute):
+        return self._memo.get(name, self._key(), lambda: compute(self.frame()))
@@ -0,0 +1,82 @@
+import hashlib
+import mmap
+import os
+import threading
+from collections import OrderedDict
+
+from descience.metrics import inc, timed
+
+# Read size for streaming hashes; large enough to amortize call overhead,
+# small enough that peak memory stays flat for multi-GB files
+CHUNK_SIZE = 1024 * 1024
+
+
+# SHA-256 of a binary file-like object, read in fixed-size chunks into one
+# reusable buffer. progress(done, total) is called after every chunk.
+@timed("hash.sha256_stream")
+def sha256_stream(fileobj, total=None, progress=None, chunk_size=CHUNK_SIZE):
+    digest = hashlib.sha256()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    done = 0
+    fileobj.seek(0)
+    while True:
+        read = fileobj.readinto(buffer)
+        if not read:
+            break
+        digest.update(view[:read])
+        done += read
+        if progress:
+            progress(done, total)
+    fileobj.seek(0)
+    inc("bytes_hashed", done)
+    return digest.hexdigest()
+
+
+# SHA-256 of a server-side file. With use_mmap the file is mapped read-only
+# and hashed slice by slice, so the pages are file-backed instead of copied
+@timed("hash.sha256_file")
+def sha256_file(path, use_mmap=False, progress=None, chunk_size=CHUNK_SIZE):
+    total = os.path.getsize(path)
+    with open(path, "rb") as f:
+        if not use_mmap or total == 0:
+            return sha256_stream(f, total=total, progress=progress, chunk_size=chunk_size)
+        digest = hashlib.sha256()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+            for offset in range(0, total, chunk_size):
+                end = min(offset + chunk_size, total)
+                digest.update(view[offset:end])
+                if progress:
+                    progress(end, total)
+        inc("bytes_hashed", total)
+        return digest.hexdigest()
+
+
+# LRU cache of upload digests keyed by (file_id, size, name),
+# so an upload is hashed once instead of on every Streamlit rerun. Safe to share between threads.
+class DigestCache:
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(uploaded_file):
+        return (getattr(uploaded_file, "file_id", None), uploaded_file.size, uploaded_file.name)
+
+    def get(self, key):
+        with self._lock:
+            digest = self._entries.get(key)
+            if digest is not None:
+                self._entries.move_to_end(key)
+            return digest
+
+    def put(self, key, digest):
+        with self._lock:
+            self._entries[key] = digest
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,263 @@
+import json
+import os
+import random
+import threading
+import time
+import traceback
+from datetime import datetime
+
+from descience.db import SQLiteStore
+
+# Durable background jobs. Sessions enqueue work and return at once; worker
+# threads (in the app process, or `python -m descience worker` elsewhere)
+# claim jobs, run them and record the result, retrying failures with
+# exponential backoff. Job state lives in SQLite, so queued work survives
+# restarts and every process sharing the file sees the same queue.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    submitted_by TEXT,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_after REAL NOT NULL,
+    started_at REAL,
+    heartbeat REAL,
+    result TEXT,
+    error TEXT,
+    created_at TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs (status, run_after, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_submitter ON jobs (submitted_by, id);
+"""
+
+DEFAULT_JOBS_PATH = "descience_jobs.db"
+
+MAX_ATTEMPTS = 5
+# Retry delays double from BACKOFF_BASE up to BACKOFF_MAX seconds, with jitter
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+# Workers stamp the jobs they are running every HEARTBEAT_INTERVAL seconds; a
+# "running" job not stamped for STALE_AFTER seconds has lost its worker (its
+# process died) and is put back in the queue
+HEARTBEAT_INTERVAL = 10
+STALE_AFTER = 60
+
+
+def _to_job(row):
+    job = dict(row)
+    job["payload"] = json.loads(job["payload"])
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def backoff(attempts):
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempts - 1)) * random.uniform(0.5, 1.0)
+
+
+# Job queue in a SQLite database (see SQLiteStore for the sharing model)
+class JobQueue(SQLiteStore):
+    schema = SCHEMA
+
+    def __init__(self, path=None, synchronous="FULL"):
+        super().__init__(path or os.getenv("DESCIENCE_JOBS_PATH", DEFAULT_JOBS_PATH), synchronous)
+        self.wakeup = threading.Event()
+        self._write_transaction(self._add_heartbeat_column)
+
+    # Queues created before workers sent heartbeats lack the column
+    @staticmethod
+    def _add_heartbeat_column(conn):
+        if "heartbeat" not in {r["name"] for r in conn.execute("PRAGMA table_info(jobs)")}:
+            conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat REAL")
+
+    def enqueue(self, kind, payload, submitted_by=None, max_attempts=MAX_ATTEMPTS):
+        conn = self._conn()
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO jobs (kind, payload, submitted_by, max_attempts, run_after, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, json.dumps(payload), submitted_by, max_attempts, time.time(), _now()),
+            )
+        # Workers in this process start at once instead of at their next poll
+        self.wakeup.set()
+        return cursor.lastrowid
+
+    # Take the next due job and mark it running, or return None. An idle queue
+    # is checked with a plain read, so polling workers don't take the write lock.
+    def claim(self):
+        now = time.time()
+        due = "SELECT * FROM jobs WHERE status = 'queued' AND run_after <= ? ORDER BY run_after, id LIMIT 1"
+        if self._conn().execute(due, (now,)).fetchone() is None:
+            return None
+
+        def take(conn):
+            row = conn.execute(due, (now,)).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = ?, heartbeat = ? "
+                "WHERE id = ?",
+                (now, now, row["id"]),
+            )
+            job = _to_job(row)
+            job.update(status="running", attempts=job["attempts"] + 1)
+            return job
+
+        return self._write_transaction(take)
+
+    def complete(self, job_id, result):
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = NULL, finished_at = ? WHERE id = ?",
+                (json.dumps(result), _now(), job_id),
+            )
+
+    # Record a failed attempt: back to the queue after a backoff delay, or
+    # failed for good once the job has used its attempts
+    def fail(self, job, error):
+        conn = self._conn()
+        with conn:
+            if job["attempts"] < job["max_attempts"]:
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued', error = ?, run_after = ? WHERE id = ?",
+                    (error, time.time() + backoff(job["attempts"]), job["id"]),
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                    (error, _now(), job["id"]),
+                )
+
+    # Mark running jobs as still alive
+    def heartbeat(self, job_ids):
+        if not job_ids:
+            return
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "UPDATE jobs SET heartbeat = ? WHERE id = ? AND status = 'running'",
+                [(time.time(), job_id) for job_id in job_ids],
+            )
+
+    # Put jobs whose worker died mid-run back in the queue
+    def requeue_stale(self, older_than=STALE_AFTER):
+        conn = self._conn()
+        with conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'queued', run_after = ? "
+                "WHERE status = 'running' AND COALESCE(heartbeat, started_at) < ?",
+                (time.time(), time.time() - older_than),
+            )
+        return cursor.rowcount
+
+    def get(self, job_id):
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _to_job(row) if row else None
+
+    # Number of jobs per status
+    def counts(self):
+        rows = self._conn().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+        return {status: count for status, count in rows}
+
+    # Newest-first jobs, optionally of one submitter
+    def recent(self, limit=20, submitted_by=None):
+        if submitted_by is None:
+            rows = self._conn().execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,))
+        else:
+            rows = self._conn().execute(
+                "SELECT * FROM jobs WHERE submitted_by = ? ORDER BY id DESC LIMIT ?", (submitted_by, limit)
+            )
+        return [_to_job(r) for r in rows]
+
+
+# Worker threads draining a JobQueue. handlers maps a job kind to a function
+# taking the payload and returning a JSON-serializable result; an exception
+# counts as a failed attempt. A heartbeat thread stamps the jobs in progress
+# and requeues those abandoned by workers of any process that died.
+class JobWorkers:
+    def __init__(self, queue, handlers, workers=2, poll_interval=1.0, heartbeat_interval=HEARTBEAT_INTERVAL):
+        self.queue = queue
+        self.handlers = handlers
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self._stop = threading.Event()
+        self._threads = []
+        self._running = set()  # ids of the jobs this pool is running
+        self._lock = threading.Lock()
+
+    # Claim and run one job; returns False if none was due
+    def run_once(self):
+        job = self.queue.claim()
+        if job is None:
+            return False
+        with self._lock:
+            self._running.add(job["id"])
+        try:
+            handler = self.handlers.get(job["kind"])
+            try:
+                if handler is None:
+                    raise ValueError(f"no handler for job kind {job['kind']!r}")
+                result = handler(job["payload"])
+            except Exception as e:
+                self.queue.fail(job, f"{type(e).__name__}: {e}")
+            else:
+                try:
+                    self.queue.complete(job["id"], result)
+                except (TypeError, ValueError) as e:  # result not JSON-serializable
+                    self.queue.fail(job, f"{type(e).__name__}: {e}")
+        finally:
+            with self._lock:
+                self._running.discard(job["id"])
+        return True
+
+    # One failing iteration (a locked database, say) must not end the thread;
+    # the job it held is picked up again once its heartbeat goes stale
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                busy = self.run_once()
+            except Exception:
+                traceback.print_exc()
+                busy = False
+            if not busy:
+                self.queue.wakeup.wait(self.poll_interval)
+                self.queue.wakeup.clear()
+
+    def _beat(self):
+        while not self._stop.is_set():
+            try:
+                with self._lock:
+                    running = list(self._running)
+                self.queue.heartbeat(running)
+                if self.queue.requeue_stale():
+                    self.queue.wakeup.set()
+            except Exception:
+                traceback.print_exc()
+            self._stop.wait(self.heartbeat_interval)
+
+    def start(self):
+        self._stop.clear()
+        self._threads.append(threading.Thread(target=self._beat, name="job-heartbeat", daemon=True))
+        self._threads += [
+            threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True) for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.queue.wakeup.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
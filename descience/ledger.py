@@ -0,0 +1,321 @@
+import json
+import os
+import time
+import uuid
+
+from descience.db import SQLiteStore
+from descience.metrics import timed
+
+# Columns stored natively; any other transaction keys go to the JSON "extra" column
+COLUMNS = [
+    "transaction_hash",
+    "block_number",
+    "timestamp",
+    "node",
+    "data_type",
+    "data_hash",
+    "filename",
+    "status",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    transaction_hash TEXT,
+    block_number INTEGER,
+    timestamp TEXT,
+    node TEXT,
+    data_type TEXT,
+    data_hash TEXT,
+    filename TEXT,
+    status TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_data_hash ON transactions (data_hash);
+-- Secondary indexes for per-submitter history, time-range (date bucket) and
+-- verification-state queries; id is included so newest-first pages walk the
+-- index instead of sorting
+CREATE INDEX IF NOT EXISTS idx_transactions_node ON transactions (node, id);
+CREATE INDEX IF NOT EXISTS idx_transactions_timestamp ON transactions (timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_transactions_status ON transactions (status, id);
+-- Every record of a Merkle batch shares its root's transaction, so confirming
+-- one chain transaction updates them together
+CREATE INDEX IF NOT EXISTS idx_transactions_tx_hash ON transactions (transaction_hash);
+-- Records are only updated when their chain transaction confirms; the trigger
+-- counts those updates so version() changes on confirmation as well as appends
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('updates', 0);
+CREATE TRIGGER IF NOT EXISTS transactions_update_version AFTER UPDATE ON transactions
+BEGIN UPDATE meta SET value = value + 1 WHERE key = 'updates'; END;
+CREATE TABLE IF NOT EXISTS pending_anchors (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    data_hash TEXT NOT NULL,
+    filename TEXT,
+    node TEXT,
+    data_type TEXT,
+    submitted_at TEXT,
+    batch TEXT,
+    claimed_at REAL
+);
+-- Records per hour ("YYYY-MM-DD HH") and submitter, kept by an insert trigger so
+-- activity charts read a few thousand rollup rows instead of scanning the ledger.
+-- A ledger created before the rollup existed is backfilled once, in the same
+-- write transaction that adds the trigger, so no insert is missed or counted twice.
+CREATE TABLE IF NOT EXISTS activity_hours (
+    hour TEXT NOT NULL,
+    node TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (hour, node)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_activity_hours_node ON activity_hours (node, hour);
+BEGIN IMMEDIATE;
+INSERT INTO activity_hours (hour, node, count)
+    SELECT substr(timestamp, 1, 13), COALESCE(node, ''), COUNT(*) FROM transactions
+    WHERE timestamp IS NOT NULL AND NOT EXISTS (SELECT 1 FROM meta WHERE key = 'activity_hours')
+    GROUP BY 1, 2;
+INSERT OR IGNORE INTO meta (key, value) VALUES ('activity_hours', 1);
+CREATE TRIGGER IF NOT EXISTS transactions_activity AFTER INSERT ON transactions WHEN NEW.timestamp IS NOT NULL
+BEGIN
+    INSERT INTO activity_hours (hour, node, count) VALUES (substr(NEW.timestamp, 1, 13), COALESCE(NEW.node, ''), 1)
+    ON CONFLICT (hour, node) DO UPDATE SET count = count + 1;
+END;
+COMMIT;
+"""
+
+DEFAULT_LEDGER_PATH = "descience_ledger.db"
+# A pending row claimed by a sealer that never finished (its process died
+# mid-submission) is offered to the next sealer after this many seconds
+CLAIM_TIMEOUT = 10 * 60
+
+INSERT_SQL = (
+    f"INSERT INTO transactions ({', '.join(COLUMNS)}, extra) "
+    f"VALUES ({', '.join('?' * (len(COLUMNS) + 1))})"
+)
+
+
+def _to_row(tx):
+    extra = {k: v for k, v in tx.items() if k not in COLUMNS}
+    return tuple(tx.get(c) for c in COLUMNS) + (json.dumps(extra) if extra else None,)
+
+
+def _to_tx(row):
+    tx = {c: row[c] for c in COLUMNS}
+    if row["extra"]:
+        tx.update(json.loads(row["extra"]))
+    return tx
+
+
+# Append-only ledger in a SQLite database (see SQLiteStore for the sharing model).
+# The only in-place change is a record's status moving from "pending" to
+# "confirmed" or "failed" once its chain transaction is mined.
+class LedgerStore(SQLiteStore):
+    schema = SCHEMA
+
+    def __init__(self, path=None, synchronous="FULL"):
+        super().__init__(path or os.getenv("DESCIENCE_LEDGER_PATH", DEFAULT_LEDGER_PATH), synchronous)
+        self._write_transaction(self._add_claim_columns)
+
+    # Ledgers created before sealers claimed their batches lack the claim columns
+    @staticmethod
+    def _add_claim_columns(conn):
+        columns = {r["name"] for r in conn.execute("PRAGMA table_info(pending_anchors)")}
+        if "batch" not in columns:
+            conn.execute("ALTER TABLE pending_anchors ADD COLUMN batch TEXT")
+            conn.execute("ALTER TABLE pending_anchors ADD COLUMN claimed_at REAL")
+
+    def append(self, tx):
+        self.append_many([tx])
+
+    # Several transactions in a single commit (and a single fsync)
+    @timed("ledger.append_many")
+    def append_many(self, transactions):
+        conn = self._conn()
+        with conn:
+            conn.executemany(INSERT_SQL, [_to_row(tx) for tx in transactions])
+
+    # Queue a data hash for the next Merkle batch
+    def add_pending(self, data_hash, filename, node, data_type="Research Data"):
+        self.add_pending_many([(data_hash, filename)], node, data_type)
+
+    # Queue many (data_hash, filename) pairs in a single commit. With a batch id
+    # the rows are queued already claimed by it, so only seal_pending(batch=...)
+    # seals them, not whoever seals the shared queue next.
+    @timed("ledger.add_pending_many")
+    def add_pending_many(self, hashes, node, data_type="Research Data", batch=None):
+        claimed_at = time.time() if batch is not None else None
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT INTO pending_anchors (data_hash, filename, node, data_type, submitted_at, batch, claimed_at) "
+                "VALUES (?, ?, ?, ?, datetime('now', 'localtime'), ?, ?)",
+                [(data_hash, filename, node, data_type, batch, claimed_at) for data_hash, filename in hashes],
+            )
+
+    def pending_count(self):
+        return self._conn().execute("SELECT COUNT(*) FROM pending_anchors").fetchone()[0]
+
+    # Turn the pending queue into ledger records. build_records gets the pending
+    # rows (oldest first) and returns the transactions to append. It may be slow
+    # (a chain submission), so it runs outside any transaction: the rows are
+    # first claimed for this batch in one short write, then the records are
+    # appended and the claimed rows deleted in another. Concurrent sealers claim
+    # disjoint rows, so nothing is anchored twice; if build_records raises, the
+    # claim is released and the rows wait for the next seal. Given a batch id,
+    # only the rows queued under it (see add_pending_many) are sealed.
+    @timed("ledger.seal_pending")
+    def seal_pending(self, build_records, batch=None):
+        own_rows = batch is not None
+        batch = batch or uuid.uuid4().hex
+
+        def claim(conn):
+            now = time.time()
+            if own_rows:
+                conn.execute("UPDATE pending_anchors SET claimed_at = ? WHERE batch = ?", (now, batch))
+            else:
+                conn.execute(
+                    "UPDATE pending_anchors SET batch = ?, claimed_at = ? WHERE batch IS NULL OR claimed_at < ?",
+                    (batch, now, now - CLAIM_TIMEOUT),
+                )
+            return [dict(r) for r in conn.execute("SELECT * FROM pending_anchors WHERE batch = ? ORDER BY id", (batch,))]
+
+        pending = self._write_transaction(claim)
+        if not pending:
+            return []
+        try:
+            records = build_records(pending)
+        except BaseException:
+            self._write_transaction(
+                lambda conn: conn.execute("UPDATE pending_anchors SET batch = NULL WHERE batch = ?", (batch,))
+            )
+            raise
+
+        def commit(conn):
+            conn.executemany(INSERT_SQL, [_to_row(tx) for tx in records])
+            conn.execute("DELETE FROM pending_anchors WHERE batch = ?", (batch,))
+
+        self._write_transaction(commit)
+        return records
+
+    # Every anchor of a data hash, oldest first
+    @timed("ledger.lookup")
+    def lookup(self, data_hash):
+        rows = self._conn().execute(
+            "SELECT * FROM transactions WHERE data_hash = ? ORDER BY id", (data_hash,)
+        )
+        return [_to_tx(r) for r in rows]
+
+    # WHERE clause for the indexed filters. since/until are "YYYY-MM-DD[ HH:MM:SS]"
+    # strings; timestamps sort lexicographically, so a day is a half-open range.
+    @staticmethod
+    def _where(node=None, status=None, since=None, until=None):
+        clauses, params = [], []
+        if node is not None:
+            clauses.append("node = ?")
+            params.append(node)
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    @timed("ledger.count")
+    def count(self, node=None, status=None, since=None, until=None):
+        where, params = self._where(node, status, since, until)
+        return self._conn().execute(f"SELECT COUNT(*) FROM transactions{where}", params).fetchone()[0]
+
+    # Newest-first page of transactions matching the filters
+    @timed("ledger.page")
+    def page(self, limit=100, offset=0, node=None, status=None, since=None, until=None):
+        where, params = self._where(node, status, since, until)
+        rows = self._conn().execute(
+            f"SELECT * FROM transactions{where} ORDER BY id DESC LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        )
+        return [_to_tx(r) for r in rows]
+
+    # Append rows already in column order (COLUMNS + extra), e.g. from an import
+    def append_rows(self, rows):
+        conn = self._conn()
+        with conn:
+            conn.executemany(INSERT_SQL, rows)
+
+    # All transactions oldest first, as lists of at most batch_size raw rows.
+    # Walks the primary key in ranges, so memory stays bounded by one batch.
+    def scan(self, batch_size=10_000):
+        last_id = 0
+        while True:
+            rows = self._conn().execute(
+                "SELECT * FROM transactions WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size)
+            ).fetchall()
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1]["id"]
+
+    # Chain transactions still awaiting a receipt, newest first, so transactions
+    # a node dropped (or a restarted local chain forgot) can't starve new ones
+    def unconfirmed(self, limit=500):
+        rows = self._conn().execute(
+            "SELECT transaction_hash FROM transactions WHERE status = 'pending' "
+            "GROUP BY transaction_hash ORDER BY MAX(id) DESC LIMIT ?",
+            (limit,),
+        )
+        return [r[0] for r in rows]
+
+    # Record receipts: (transaction_hash, block_number, succeeded) triples.
+    # Records already confirmed (e.g. by another process) are left alone.
+    @timed("ledger.confirm")
+    def confirm(self, receipts):
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "UPDATE transactions SET status = ?, block_number = ? "
+                "WHERE transaction_hash = ? AND status = 'pending'",
+                [("confirmed" if ok else "failed", block, tx_hash) for tx_hash, block, ok in receipts],
+            )
+
+    # (status, block_number) of a chain transaction, or None if it isn't on the ledger
+    def transaction_status(self, transaction_hash):
+        row = self._conn().execute(
+            "SELECT status, block_number FROM transactions WHERE transaction_hash = ? LIMIT 1",
+            (transaction_hash,),
+        ).fetchone()
+        return (row["status"], row["block_number"]) if row else None
+
+    # Changes whenever a transaction is appended or confirmed
+    def version(self):
+        return tuple(self._conn().execute(
+            "SELECT (SELECT COALESCE(MAX(id), 0) FROM transactions), (SELECT value FROM meta WHERE key = 'updates')"
+        ).fetchone())
+
+    def recent(self, limit=10):
+        return self.page(limit=limit)
+
+    # Records per hour, oldest first, as (hour "YYYY-MM-DD HH", count) pairs:
+    # for one submitter or all of them, from the `since` hour on
+    @timed("ledger.hourly_activity")
+    def hourly_activity(self, node=None, since=None):
+        clauses, params = [], []
+        if node is not None:
+            clauses.append("node = ?")
+            params.append(node)
+        if since is not None:
+            clauses.append("hour >= ?")
+            params.append(since)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        rows = self._conn().execute(
+            f"SELECT hour, SUM(count) FROM activity_hours{where} GROUP BY hour ORDER BY hour", params
+        )
+        return [tuple(r) for r in rows]
+
+    # Submitters by number of records, busiest first
+    def activity_nodes(self, limit=100):
+        rows = self._conn().execute(
+            "SELECT node, SUM(count) FROM activity_hours GROUP BY node ORDER BY 2 DESC LIMIT ?", (limit,)
+        )
+        return [r[0] for r in rows]
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# In-process stand-in for an Ethereum dev node (anvil/ganache style), for
+# running the app, CLI and benchmarks without a real chain. It serves the
+# JSON-RPC subset JsonRpcChain uses, over keep-alive HTTP, including batches.
+# Transactions wait in a mempool and are mined every block_time seconds;
+# nothing is persisted, so the chain starts over with the process.
+
+DEV_ACCOUNT = "0x" + hashlib.sha256(b"descience-dev-account").hexdigest()[:40]
+
+
+class RpcError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+class LocalChain:
+    def __init__(self, block_time=1.0, chain_id=1337, host="127.0.0.1", port=0):
+        self.block_time = block_time
+        self.chain_id = chain_id
+        self.block_number = 0
+        self._lock = threading.Lock()
+        self._nonces = {}
+        self._mempool = []
+        self._receipts = {}
+        self._stop = threading.Event()
+        self._server = ThreadingHTTPServer((host, port), _handler(self))
+        self._server.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, name="local-chain-rpc", daemon=True).start()
+        threading.Thread(target=self._mine, name="local-chain-miner", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _mine(self):
+        while not self._stop.wait(self.block_time):
+            self.mine_block()
+
+    # Seal the mempool into the next block
+    def mine_block(self):
+        with self._lock:
+            self.block_number += 1
+            for tx_hash in self._mempool:
+                self._receipts[tx_hash] = {
+                    "transactionHash": tx_hash,
+                    "blockNumber": hex(self.block_number),
+                    "status": "0x1",
+                }
+            self._mempool = []
+
+    def _accept(self, sender, nonce, payload):
+        expected = self._nonces.get(sender, 0)
+        if nonce is None:
+            nonce = expected
+        if nonce < expected:
+            raise RpcError(-32000, f"nonce too low: next nonce {expected}, tx nonce {nonce}")
+        if nonce > expected:
+            raise RpcError(-32000, f"nonce too high: next nonce {expected}, tx nonce {nonce}")
+        self._nonces[sender] = nonce + 1
+        tx_hash = "0x" + hashlib.sha3_256(f"{self.chain_id}:{sender}:{nonce}:{payload}".encode()).hexdigest()
+        self._mempool.append(tx_hash)
+        return tx_hash
+
+    def _send_transaction(self, tx):
+        sender = tx.get("from", "").lower()
+        if sender != DEV_ACCOUNT:
+            raise RpcError(-32000, f"unknown account {sender}")
+        nonce = int(tx["nonce"], 16) if "nonce" in tx else None
+        return self._accept(sender, nonce, tx.get("data", ""))
+
+    # Signed transactions are accepted from any sender; the nonce is not checked
+    def _send_raw_transaction(self, raw):
+        from eth_account import Account
+        return self._accept(Account.recover_transaction(raw).lower(), None, raw)
+
+    def _dispatch(self, method, params):
+        with self._lock:
+            if method == "eth_chainId":
+                return hex(self.chain_id)
+            if method == "eth_blockNumber":
+                return hex(self.block_number)
+            if method == "eth_accounts":
+                return [DEV_ACCOUNT]
+            if method == "eth_gasPrice":
+                return hex(1_000_000_000)
+            if method == "eth_getTransactionCount":
+                return hex(self._nonces.get(params[0].lower(), 0))
+            if method == "eth_sendTransaction":
+                return self._send_transaction(params[0])
+            if method == "eth_sendRawTransaction":
+                return self._send_raw_transaction(params[0])
+            if method == "eth_getTransactionReceipt":
+                return self._receipts.get(params[0])
+        raise RpcError(-32601, f"method not found: {method}")
+
+    def _respond(self, request):
+        response = {"jsonrpc": "2.0", "id": request.get("id")}
+        try:
+            response["result"] = self._dispatch(request.get("method"), request.get("params") or [])
+        except RpcError as e:
+            response["error"] = {"code": e.code, "message": str(e)}
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            response["error"] = {"code": -32602, "message": f"invalid params: {e}"}
+        return response
+
+    # A JSON-RPC request or batch (list of requests)
+    def handle(self, payload):
+        if isinstance(payload, list):
+            return [self._respond(r) for r in payload]
+        return self._respond(payload)
+
+
+def _handler(chain):
+    class Handler(BaseHTTPRequestHandler):
+        # HTTP/1.1 keeps connections open, so pooled clients reuse them
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; without TCP_NODELAY the
+        # body waits on the client's delayed ACK (~40 ms per request)
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                body = chain.handle(payload)
+            except ValueError:
+                body = {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "parse error"}}
+            data = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
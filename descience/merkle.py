@@ -0,0 +1,54 @@
+import hashlib
+
+# Domain separation between leaves and inner nodes, so an inner node can never
+# be passed off as a leaf (second-preimage attack on the tree)
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+
+def _leaf(data_hash):
+    return hashlib.sha256(LEAF_PREFIX + bytes.fromhex(data_hash)).digest()
+
+
+def _node(left, right):
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+# Every level of the tree, leaves first. An odd node at the end of a level is
+# promoted unchanged rather than paired with a copy of itself.
+def build_tree(data_hashes):
+    if not data_hashes:
+        raise ValueError("Cannot build a Merkle tree with no leaves")
+    levels = [[_leaf(h) for h in data_hashes]]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [_node(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+    return levels
+
+
+def merkle_root(levels):
+    return levels[-1][0].hex()
+
+
+# Sibling hashes from leaf to root as [hex, side] pairs, side being where the
+# sibling sits ("L" or "R"). JSON-friendly so it can be stored with the record.
+def inclusion_proof(levels, index):
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append([level[sibling].hex(), "L" if sibling < index else "R"])
+        index //= 2
+    return proof
+
+
+# O(log n) check that data_hash is a leaf of the tree with the given root
+def verify_proof(data_hash, proof, root):
+    current = _leaf(data_hash)
+    for sibling_hex, side in proof:
+        sibling = bytes.fromhex(sibling_hex)
+        current = _node(sibling, current) if side == "L" else _node(current, sibling)
+    return current.hex() == root
@@ -0,0 +1,191 @@
+import functools
+import os
+import threading
+import time
+import traceback
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Opt-in instrumentation: timing spans around app sections and store
+# operations, plus counters (bytes hashed, anchors, logins), exported in
+# Prometheus text format. Enabled with DESCIENCE_METRICS=1 before the process
+# starts. When disabled, timed() returns the function itself, span() a shared
+# no-op context manager and inc() a single flag check, so it costs nothing.
+ENABLED = os.getenv("DESCIENCE_METRICS", "") not in ("", "0")
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NULL_SPAN = nullcontext()
+
+
+# Span timings and counters for one process. Safe to share between threads.
+class Metrics:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._spans = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        with self._lock:
+            span = self._spans.get(name)
+            if span is None:
+                span = self._spans[name] = {"count": 0, "total": 0.0, "max": 0.0, "buckets": [0] * len(self.buckets)}
+            span["count"] += 1
+            span["total"] += seconds
+            span["max"] = max(span["max"], seconds)
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    span["buckets"][i] += 1
+                    break
+
+    def inc(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    # Spans as dicts (name, count, total, mean and max seconds), most total time first
+    def sections(self):
+        with self._lock:
+            rows = [
+                {"name": name, "count": s["count"], "total": s["total"],
+                 "mean": s["total"] / s["count"], "max": s["max"]}
+                for name, s in self._spans.items()
+            ]
+        return sorted(rows, key=lambda r: r["total"], reverse=True)
+
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._counters.clear()
+
+    # Prometheus text exposition format (version 0.0.4)
+    def prometheus(self):
+        with self._lock:
+            spans = {name: dict(s, buckets=list(s["buckets"])) for name, s in sorted(self._spans.items())}
+            counters = sorted(self._counters.items())
+        lines = [
+            "# HELP descience_section_seconds Time spent in instrumented app sections and store operations.",
+            "# TYPE descience_section_seconds histogram",
+        ]
+        for name, s in spans.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, s["buckets"]):
+                cumulative += count
+                lines.append(f'descience_section_seconds_bucket{{section="{name}",le="{bound:g}"}} {cumulative}')
+            lines.append(f'descience_section_seconds_bucket{{section="{name}",le="+Inf"}} {s["count"]}')
+            lines.append(f'descience_section_seconds_sum{{section="{name}"}} {s["total"]:.6f}')
+            lines.append(f'descience_section_seconds_count{{section="{name}"}} {s["count"]}')
+        for name, value in counters:
+            lines.append(f"# TYPE descience_{name}_total counter")
+            lines.append(f"descience_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.prometheus())
+        os.replace(tmp, path)
+
+
+# Process-wide metrics the helpers below record into
+metrics = Metrics()
+
+
+def span(name):
+    return metrics.span(name) if ENABLED else _NULL_SPAN
+
+
+def inc(name, amount=1):
+    if ENABLED:
+        metrics.inc(name, amount)
+
+
+# Decorator timing every call of a function as a span (named after the
+# function unless given a name); a no-op when metrics are disabled
+def timed(name=None):
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with metrics.span(label):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def _handler(registry):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = registry.prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+# Serve the metrics at http://host:port/metrics for a Prometheus scraper, from
+# a daemon thread. Binds to localhost unless told otherwise. Returns the server.
+def serve(port, host="127.0.0.1", registry=None):
+    server = ThreadingHTTPServer((host, port), _handler(registry or metrics))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+# Write the metrics to path every interval seconds, from a daemon thread, for
+# node_exporter's textfile collector or a plain look at a worker process
+def write_every(path, interval=15.0, registry=None):
+    registry = registry or metrics
+
+    def loop():
+        while True:
+            # A failed write (disk full, permissions) is reported and retried
+            # next interval instead of ending the export for good
+            try:
+                registry.write(path)
+            except Exception:
+                traceback.print_exc()
+            time.sleep(interval)
+
+    thread = threading.Thread(target=loop, name="metrics-file", daemon=True)
+    thread.start()
+    return thread
+
+
+# Start whatever exporters the environment asks for: an HTTP endpoint on
+# DESCIENCE_METRICS_PORT and/or a file at DESCIENCE_METRICS_FILE. Nothing runs
+# unless metrics are enabled.
+def start_exporters():
+    if not ENABLED:
+        return
+    if os.getenv("DESCIENCE_METRICS_PORT"):
+        serve(int(os.getenv("DESCIENCE_METRICS_PORT")))
+    if os.getenv("DESCIENCE_METRICS_FILE"):
+        write_every(os.getenv("DESCIENCE_METRICS_FILE"))
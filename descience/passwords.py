@@ -0,0 +1,117 @@
+import hashlib
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Stored password formats:
+#   scrypt$<n>$<r>$<p>$<salt hex>$<hash hex>
+#   pbkdf2_sha256$<iterations>$<salt hex>$<hash hex>
+#   <64 hex chars>   legacy unsalted SHA-256, verify-only; rehashed on login
+
+SALT_BYTES = 16
+
+
+# Memory-hard KDF; n=2**14, r=8 uses 16 MiB and ~30-50 ms per hash on a laptop
+class ScryptHasher:
+    name = "scrypt"
+
+    def __init__(self, n=2 ** 14, r=8, p=1):
+        self.n, self.r, self.p = n, r, p
+
+    def _derive(self, password, salt, n, r, p):
+        return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                              maxmem=256 * n * r * p, dklen=32)
+
+    def hash(self, password):
+        salt = os.urandom(SALT_BYTES)
+        digest = self._derive(password, salt, self.n, self.r, self.p)
+        return f"{self.name}${self.n}${self.r}${self.p}${salt.hex()}${digest.hex()}"
+
+    def verify(self, password, encoded):
+        _, n, r, p, salt, digest = encoded.split("$")
+        derived = self._derive(password, bytes.fromhex(salt), int(n), int(r), int(p))
+        return hmac.compare_digest(derived.hex(), digest)
+
+    def needs_rehash(self, encoded):
+        return encoded.split("$")[1:4] != [str(self.n), str(self.r), str(self.p)]
+
+
+class Pbkdf2Hasher:
+    name = "pbkdf2_sha256"
+
+    def __init__(self, iterations=600_000):
+        self.iterations = iterations
+
+    def hash(self, password):
+        salt = os.urandom(SALT_BYTES)
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, self.iterations)
+        return f"{self.name}${self.iterations}${salt.hex()}${digest.hex()}"
+
+    def verify(self, password, encoded):
+        _, iterations, salt, digest = encoded.split("$")
+        derived = hashlib.pbkdf2_hmac("sha256", password.encode(), bytes.fromhex(salt), int(iterations))
+        return hmac.compare_digest(derived.hex(), digest)
+
+    def needs_rehash(self, encoded):
+        return encoded.split("$")[1] != str(self.iterations)
+
+
+# The original unsalted single-round SHA-256; only used to check old records
+class LegacySha256Hasher:
+    name = "sha256"
+
+    def hash(self, password):
+        return hashlib.sha256(password.encode()).hexdigest()
+
+    def verify(self, password, encoded):
+        return hmac.compare_digest(self.hash(password), encoded)
+
+    def needs_rehash(self, encoded):
+        return True
+
+
+_password_hasher = ScryptHasher()
+
+# KDF work runs on a bounded pool, so a login storm queues instead of taking
+# every core away from page rendering. scrypt and PBKDF2 release the GIL.
+KDF_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+_kdf_pool = ThreadPoolExecutor(max_workers=KDF_WORKERS, thread_name_prefix="kdf")
+
+
+# Swap the hasher (and cost) used for new hashes, e.g. ScryptHasher(n=2 ** 15)
+def set_password_hasher(hasher):
+    global _password_hasher
+    _password_hasher = hasher
+
+
+def get_password_hasher():
+    return _password_hasher
+
+
+def _hasher_for(encoded):
+    scheme = encoded.split("$", 1)[0] if "$" in encoded else LegacySha256Hasher.name
+    if scheme == _password_hasher.name:
+        return _password_hasher
+    return {
+        ScryptHasher.name: ScryptHasher,
+        Pbkdf2Hasher.name: Pbkdf2Hasher,
+        LegacySha256Hasher.name: LegacySha256Hasher,
+    }[scheme]()
+
+
+def _verify(password, encoded):
+    hasher = _hasher_for(encoded)
+    if not hasher.verify(password, encoded):
+        return False, False
+    return True, hasher is not _password_hasher or hasher.needs_rehash(encoded)
+
+
+# Hash a password with the configured hasher, on the KDF pool
+def hash_password(password):
+    return _kdf_pool.submit(_password_hasher.hash, password).result()
+
+
+# (matches, needs_rehash) for a stored hash, checked on the KDF pool.
+# needs_rehash means the record uses a legacy scheme or an outdated cost.
+def verify_password(password, encoded):
+    return _kdf_pool.submit(_verify, password, encoded).result()
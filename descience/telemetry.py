@@ -0,0 +1,204 @@
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Live per-node activity pushed by the nodes themselves. Each node gets a row
+# in two fixed-size ring buffers, submissions and bytes per minute over the
+# last WINDOW minutes, so memory per node is constant however long the app
+# runs. Rows live in shared 2-D NumPy arrays: ingesting a batch is a few
+# np.add.at calls, and fleet-wide rates are column sums over every node at once.
+WINDOW = 60
+# Events dated further ahead than this are dropped rather than moving the clock
+MAX_CLOCK_SKEW = 60
+
+
+def _minute(timestamp):
+    return int(timestamp // 60)
+
+
+# Ring-buffered per-node telemetry for the nodes of a NodeRegistry. Pushed
+# submissions also advance the nodes' data_points and last_submission.
+# Safe to share between threads.
+class NodeTelemetry:
+    def __init__(self, registry, window=WINDOW, capacity=1024):
+        self.registry = registry
+        self.window = window
+        self.submissions = np.zeros((capacity, window), dtype=np.int32)
+        self.bytes = np.zeros((capacity, window), dtype=np.int64)
+        self._rows = {}  # node id -> row in the buffers
+        self._ids = []  # row -> node id
+        self._minute = _minute(time.time())  # newest minute the buffers hold
+        self._lock = threading.Lock()
+        self.version = 0
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _row(self, node_id):
+        row = self._rows.get(node_id)
+        if row is None:
+            if node_id not in self.registry:
+                return -1
+            row = self._rows[node_id] = len(self._ids)
+            self._ids.append(node_id)
+            if row == len(self.submissions):
+                self.submissions = np.concatenate([self.submissions, np.zeros_like(self.submissions)])
+                self.bytes = np.concatenate([self.bytes, np.zeros_like(self.bytes)])
+        return row
+
+    # Move the ring forward to minute, clearing the columns it wraps onto
+    def _advance(self, minute):
+        steps = minute - self._minute
+        if steps <= 0:
+            return
+        columns = (self._minute + 1 + np.arange(min(steps, self.window))) % self.window
+        self.submissions[:, columns] = 0
+        self.bytes[:, columns] = 0
+        self._minute = minute
+
+    # Record submission events: (node id, bytes, data points, unix timestamp or
+    # None for now) tuples. Events for unknown nodes, from before the window or
+    # too far in the future are skipped. Returns the number recorded.
+    def ingest(self, events, now=None):
+        events = list(events)
+        if not events:
+            return 0
+        now = time.time() if now is None else now
+        node_ids, sizes, points, stamps = zip(*events)
+        sizes = np.asarray(sizes, dtype=np.int64)
+        points = np.asarray(points, dtype=np.int64)
+        stamps = np.array([now if s is None else s for s in stamps], dtype=np.float64)
+        minutes = (stamps // 60).astype(np.int64)
+        with self._lock:
+            self._advance(_minute(now))
+            rows = np.fromiter((self._row(n) for n in node_ids), dtype=np.int64, count=len(node_ids))
+            keep = (rows >= 0) & (minutes > self._minute - self.window) & (stamps <= now + MAX_CLOCK_SKEW)
+            if not keep.any():
+                return 0
+            rows, minutes, sizes, points, stamps = rows[keep], minutes[keep], sizes[keep], points[keep], stamps[keep]
+            # A slightly fast clock lands in the current minute
+            columns = np.minimum(minutes, self._minute) % self.window
+            np.add.at(self.submissions, (rows, columns), 1)
+            np.add.at(self.bytes, (rows, columns), sizes)
+
+            touched, inverse = np.unique(rows, return_inverse=True)
+            point_sums = np.bincount(inverse, weights=points).astype(np.int64)
+            latest = np.full(len(touched), -np.inf)
+            np.maximum.at(latest, inverse, stamps)
+            self.registry.record_submissions({
+                self._ids[row]: (int(total), datetime.fromtimestamp(last).strftime("%Y-%m-%d %H:%M:%S"))
+                for row, total, last in zip(touched, point_sums, latest)
+            })
+            self.version += 1
+        return int(keep.sum())
+
+    # Columns of the last `minutes` minutes, oldest first, after moving the
+    # ring to the current minute. Call with the lock held.
+    def _columns(self, minutes):
+        self._advance(_minute(time.time()))
+        return (self._minute - np.arange(min(minutes, self.window))[::-1]) % self.window
+
+    # Fleet-wide submissions and bytes per minute over the last `minutes`
+    # minutes, oldest first, with the minute start times. Sums each column over
+    # all nodes first, so only `minutes` values are reordered.
+    def fleet_series(self, minutes=WINDOW):
+        with self._lock:
+            columns = self._columns(minutes)
+            n = len(self._ids)
+            submissions = self.submissions[:n].sum(axis=0)[columns]
+            sizes = self.bytes[:n].sum(axis=0)[columns]
+            newest = self._minute
+        starts = [datetime.fromtimestamp((newest - i) * 60) for i in range(len(columns) - 1, -1, -1)]
+        return starts, submissions, sizes
+
+    # Per-node submissions and bytes per minute, averaged over the last `minutes`
+    # minutes: (node ids, submission rates, byte rates)
+    def node_rates(self, minutes=5):
+        with self._lock:
+            columns = self._columns(minutes)
+            n = len(self._ids)
+            ids = list(self._ids)
+            submissions = self.submissions[:n, columns].sum(axis=1)
+            sizes = self.bytes[:n, columns].sum(axis=1)
+        return ids, submissions / minutes, sizes / minutes
+
+    # Fleet summary over the last `minutes` minutes, plus the `top` busiest
+    # nodes by bytes per minute as (node id, submissions/min, bytes/min)
+    def summary(self, minutes=5, top=10):
+        ids, rates, byte_rates = self.node_rates(minutes)
+        busiest = []
+        if len(ids):
+            k = min(top, len(ids))
+            picks = np.argpartition(byte_rates, -k)[-k:]
+            picks = picks[np.argsort(byte_rates[picks])[::-1]]
+            busiest = [(ids[i], float(rates[i]), float(byte_rates[i])) for i in picks if rates[i] > 0]
+        return {
+            "reporting_nodes": len(ids),
+            "active_nodes": int(np.count_nonzero(rates)),
+            "submissions_per_minute": float(rates.sum()),
+            "bytes_per_minute": float(byte_rates.sum()),
+            "busiest": busiest,
+        }
+
+
+# Events from a pushed JSON body: a list of {"node", "bytes", "points",
+# "timestamp"} objects (or {"events": [...]}); bytes and points default to 0
+# and 1, timestamp (unix seconds) to the time of receipt. Raises ValueError,
+# KeyError or TypeError on a malformed event, so nothing is ingested.
+def parse_events(body):
+    payload = json.loads(body)
+    if isinstance(payload, dict):
+        payload = payload.get("events", [payload])
+    events = []
+    for e in payload:
+        size, points = int(e.get("bytes", 0)), int(e.get("points", 1))
+        if size < 0 or points < 0:
+            raise ValueError(f"negative bytes or points for node {e['node']!r}")
+        timestamp = e.get("timestamp")
+        if timestamp is not None:
+            timestamp = float(timestamp)
+            if not math.isfinite(timestamp):
+                raise ValueError(f"bad timestamp for node {e['node']!r}")
+        events.append((str(e["node"]), size, points, timestamp))
+    return events
+
+
+def _handler(telemetry):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/events":
+                self.send_error(404)
+                return
+            try:
+                events = parse_events(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            except (ValueError, KeyError, TypeError) as e:
+                self.send_error(400, f"bad events: {e}")
+                return
+            accepted = telemetry.ingest(events)
+            body = json.dumps({"accepted": accepted, "rejected": len(events) - accepted}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+# Accept pushed events at POST http://host:port/events, from a daemon thread.
+# There is no authentication: bind to a private interface or put it behind a proxy.
+def serve(telemetry, port, host=None):
+    host = host or os.getenv("DESCIENCE_TELEMETRY_HOST", "127.0.0.1")
+    server = ThreadingHTTPServer((host, port), _handler(telemetry))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="telemetry-http", daemon=True).start()
+    return server
@@ -1,20 +1,23 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import hashlib
-import json
-import time
 from datetime import datetime, timedelta
-import plotly.graph_objects as go
-import plotly.express as px
-from PIL import Image
 import io
-import base64
 import os
 from dotenv import load_dotenv
-import requests
-import random
-import re
+from descience.accounts import AccountStore
+from descience.anchoring import MAX_BATCH_SIZE, anchor_failed, anchoring_job_handlers, verify_data_hash
+from descience.auth import authenticate_user, default_users_db, register_user
+from descience.bulk import hash_entries, upload_entries
+from descience.chain import ConfirmationTracker, connect_chain
+from descience.chunks import ChunkStore, chunk_stream
+from descience.downsample import lttb
+from descience.frames import NodeFrames, VersionedMemo
+from descience.hashing import DigestCache, sha256_stream
+from descience.jobs import JobQueue, JobWorkers
+from descience.ledger import LedgerStore
+from descience.metrics import ENABLED as METRICS_ENABLED, metrics, span, start_exporters, timed
+from descience.nodes import NodeRegistry, default_nodes, format_stake, register_node
+from descience.telemetry import NodeTelemetry, serve as serve_telemetry
 
 # Page configuration
 st.set_page_config(
@@ -115,61 +118,6 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ===== FUNCTION DEFINITIONS (MOVE TO TOP) =====
-# Password hashing function
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
-
-# Validate email format
-def is_valid_email(email):
-    pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
-    return re.match(pattern, email) is not None
-
-# Validate password strength
-def is_strong_password(password):
-    if len(password) < 8:
-        return False
-    if not re.search(r'[A-Z]', password):
-        return False
-    if not re.search(r'[a-z]', password):
-        return False
-    if not re.search(r'\d', password):
-        return False
-    return True
-
-# Authentication functions
-def authenticate_user(username, password):
-    if username in st.session_state.users_db:
-        if st.session_state.users_db[username]["password"] == hash_password(password):
-            # Update last login
-            st.session_state.users_db[username]["last_login"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            return True
-    return False
-
-def register_user(username, password, name, email, role, institution):
-    if username in st.session_state.users_db:
-        return False, "Username already exists"
-    
-    if not is_valid_email(email):
-        return False, "Invalid email format"
-    
-    if not is_strong_password(password):
-        return False, "Password must be at least 8 characters with uppercase, lowercase, and numbers"
-    
-    # Add to registration requests (pending approval)
-    request = {
-        "username": username,
-        "password": hash_password(password),
-        "name": name,
-        "email": email,
-        "role": role,
-        "institution": institution,
-        "verified": False,
-        "request_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "status": "pending"
-    }
-    st.session_state.registration_requests.append(request)
-    return True, "Registration submitted for approval"
-
 # Get user role badge
 def get_role_badge(role):
     badges = {
@@ -188,14 +136,85 @@ def logout():
     st.session_state.login_time = None
     st.rerun()
 
-# Helper function to safely extract stake value
-def get_stake_value(stake_str):
-    try:
-        if stake_str and isinstance(stake_str, str):
-            return float(stake_str.split()[0])
-        return 0
-    except (ValueError, IndexError, AttributeError):
-        return 0
+# Durable ledger shared by every session (and any other process using the same file)
+@st.cache_resource
+def get_ledger():
+    return LedgerStore()
+
+# Accounts and signup requests, shared the same way; demo users are seeded once
+@st.cache_resource
+def get_accounts():
+    accounts = AccountStore()
+    accounts.seed(default_users_db())
+    return accounts
+
+# Research node registry: one per process instead of a copy in every session.
+# NodeRegistry locks internally, since Streamlit runs sessions on separate threads.
+# DESCIENCE_NODES_PATH adds the nodes of a file written by columnar.export_nodes
+# (e.g. the audit log's node download), to start from a saved or synthetic fleet.
+@st.cache_resource
+def get_node_registry():
+    registry = NodeRegistry(default_nodes())
+    if os.getenv("DESCIENCE_NODES_PATH"):
+        from descience.columnar import import_nodes
+        import_nodes(registry, os.getenv("DESCIENCE_NODES_PATH"))
+    return registry
+
+# Upload digests, shared too; keys include the upload's unique file id
+@st.cache_resource
+def get_digest_cache():
+    return DigestCache(max_entries=1024)
+
+# Anchoring backend: the node at DESCIENCE_RPC_URL, or an in-process stand-in chain.
+# One pooled client per process, with a background tracker confirming anchors.
+@st.cache_resource
+def get_chain():
+    chain = connect_chain()
+    ConfirmationTracker(get_ledger(), chain).start()
+    return chain
+
+# Durable queue for anchoring work, shared by every session. DESCIENCE_JOB_WORKERS
+# threads in this process drain it (default 2); with 0, run `python -m descience worker`
+# separately against the same DESCIENCE_JOBS_PATH and DESCIENCE_RPC_URL.
+@st.cache_resource
+def get_job_queue():
+    queue = JobQueue()
+    workers = int(os.getenv("DESCIENCE_JOB_WORKERS", "2"))
+    if workers:
+        JobWorkers(queue, anchoring_job_handlers(get_ledger(), queue, get_chain()), workers).start()
+    return queue
+
+# Chunk digests and per-file manifests, so re-uploaded dataset versions only
+# record their new chunks and verification can say what changed
+@st.cache_resource
+def get_chunk_store():
+    return ChunkStore()
+
+# Tables and chart inputs, rebuilt only when the data behind them changes.
+# Keys are derived from query parameters, so sessions viewing the same page share entries.
+@st.cache_resource
+def get_node_frames():
+    return NodeFrames(get_node_registry())
+
+@st.cache_resource
+def get_frame_memo():
+    return VersionedMemo()
+
+# Submission rates pushed by the nodes, in fixed-size ring buffers per node.
+# With DESCIENCE_TELEMETRY_PORT set, nodes push to POST /events on that port
+# (e.g. `python -m descience push --node NODE-001 FILE...`).
+@st.cache_resource
+def get_node_telemetry():
+    telemetry = NodeTelemetry(get_node_registry())
+    if os.getenv("DESCIENCE_TELEMETRY_PORT"):
+        serve_telemetry(telemetry, int(os.getenv("DESCIENCE_TELEMETRY_PORT")))
+    return telemetry
+
+# Prometheus endpoint/file for the timings and counters, started once per process
+# when DESCIENCE_METRICS is on (see descience/metrics.py)
+@st.cache_resource
+def get_metrics_exporters():
+    start_exporters()
 
 # ===== INITIALIZE SESSION STATE =====
 if 'authenticated' not in st.session_state:
@@ -208,257 +227,139 @@ if 'login_time' not in st.session_state:
     st.session_state.login_time = None
 if 'show_register' not in st.session_state:
     st.session_state.show_register = False
+# Messages queued by handlers to show after their st.rerun()
+if 'flash_messages' not in st.session_state:
+    st.session_state.flash_messages = []
+# Background jobs this session queued, then the chain transactions they
+# submitted, followed until they finish (see show_job_status)
+if 'watched_jobs' not in st.session_state:
+    st.session_state.watched_jobs = []
+if 'awaiting_confirmation' not in st.session_state:
+    st.session_state.awaiting_confirmation = []
+if 'live_updates' not in st.session_state:
+    st.session_state.live_updates = False
+# Latest chunk scan per upload purpose (see chunk_uploaded_file)
+if 'chunk_scans' not in st.session_state:
+    st.session_state.chunk_scans = {}
 
-# Initialize users database (simulated) - NOW FUNCTIONS ARE DEFINED
-if 'users_db' not in st.session_state:
-    st.session_state.users_db = {
-        # Default users with different roles
-        "researcher1": {
-            "password": hash_password("research123"),
-            "name": "Dr. Sarah Chen",
-            "email": "sarah.chen@research.org",
-            "role": "researcher",
-            "institution": "Stanford University",
-            "verified": True,
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "last_login": None
-        },
-        "validator1": {
-            "password": hash_password("validate123"),
-            "name": "Prof. James Wilson",
-            "email": "j.wilson@blockchain-lab.io",
-            "role": "validator",
-            "institution": "MIT Blockchain Lab",
-            "verified": True,
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "last_login": None
-        },
-        "auditor1": {
-            "password": hash_password("audit123"),
-            "name": "Dr. Maria Garcia",
-            "email": "m.garcia@ethics-board.org",
-            "role": "auditor",
-            "institution": "Research Ethics Board",
-            "verified": True,
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "last_login": None
-        },
-        "admin": {
-            "password": hash_password("admin123"),
-            "name": "System Administrator",
-            "email": "admin@de-science.io",
-            "role": "admin",
-            "institution": "De-Science Foundation",
-            "verified": True,
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "last_login": None
-        },
-        "demo_user": {
-            "password": hash_password("demo123"),
-            "name": "Demo Researcher",
-            "email": "demo@example.com",
-            "role": "researcher",
-            "institution": "Demo University",
-            "verified": True,
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "last_login": None
-        }
-    }
+# Shared, process-wide state: every session reads and writes the same objects
+accounts = get_accounts()
+ledger = get_ledger()
+research_nodes = get_node_registry()
+telemetry = get_node_telemetry()
+digest_cache = get_digest_cache()
+chunk_store = get_chunk_store()
+jobs = get_job_queue()
+node_frames = get_node_frames()
+frames = get_frame_memo()
+get_metrics_exporters()
 
-# Initialize registration requests (for new user signups)
-if 'registration_requests' not in st.session_state:
-    st.session_state.registration_requests = []
-
-# Initialize blockchain and research nodes
-if 'blockchain' not in st.session_state:
-    st.session_state.blockchain = []
-    
-if 'research_nodes' not in st.session_state:
-    st.session_state.research_nodes = [
-        {
-            "id": "NODE-001",
-            "name": "Amazon Rainforest eDNA Station",
-            "type": "eDNA Sensor",
-            "location": "Manaus, Brazil",
-            "status": "active",
-            "last_submission": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "data_points": 1245,
-            "verified": True,
-            "node_address": "0x742d35Cc6634C0532925a3b844Bc454e4438f44e",
-            "stake": "32 ETH",
-            "owner": "researcher1"
-        },
-        {
-            "id": "NODE-002",
-            "name": "Mars Rover Telemetry", 
-            "type": "Space Telemetry",
-            "location": "Jezero Crater, Mars",
-            "status": "active",
-            "last_submission": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "data_points": 3567,
-            "verified": True,
-            "node_address": "0x8aB4F35Cc6634C0532925a3b844Bc454e4438f77a",
-            "stake": "48 ETH",
-            "owner": "researcher1"
-        },
-        {
-            "id": "NODE-003",
-            "name": "Pacific Ocean eDNA Array",
-            "type": "Marine eDNA", 
-            "location": "Great Barrier Reef",
-            "status": "active",
-            "last_submission": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "data_points": 892,
-            "verified": True,
-            "node_address": "0x9cD4F25Cc6634C0532925a3b844Bc454e4438f88b",
-            "stake": "24 ETH",
-            "owner": "researcher1"
-        }
-    ]
+# Refresh interval of live panels (see live_fragment)
+REFRESH_SECONDS = float(os.getenv("DESCIENCE_REFRESH_SECONDS", "5"))
 
 # Smart Contract Configuration
 CONTRACT_ADDRESS = "0x1a2b3c4d5e6f7g8h9i0j1k2l3m4n5o6p7q8r9s0t"
 
-# The rest of your code (login_page, register_page, main_app functions, etc.) remains exactly the same...
-
-
-# Initialize registration requests (for new user signups)
-if 'registration_requests' not in st.session_state:
-    st.session_state.registration_requests = []
-
-# Password hashing function
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
-
-# Validate email format
-def is_valid_email(email):
-    pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
-    return re.match(pattern, email) is not None
-
-# Validate password strength
-def is_strong_password(password):
-    if len(password) < 8:
-        return False
-    if not re.search(r'[A-Z]', password):
-        return False
-    if not re.search(r'[a-z]', password):
-        return False
-    if not re.search(r'\d', password):
-        return False
-    return True
-
-# Authentication functions
-def authenticate_user(username, password):
-    if username in st.session_state.users_db:
-        if st.session_state.users_db[username]["password"] == hash_password(password):
-            # Update last login
-            st.session_state.users_db[username]["last_login"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            return True
-    return False
-
-def register_user(username, password, name, email, role, institution):
-    if username in st.session_state.users_db:
-        return False, "Username already exists"
-    
-    if not is_valid_email(email):
-        return False, "Invalid email format"
-    
-    if not is_strong_password(password):
-        return False, "Password must be at least 8 characters with uppercase, lowercase, and numbers"
-    
-    # Add to registration requests (pending approval)
-    request = {
-        "username": username,
-        "password": hash_password(password),
-        "name": name,
-        "email": email,
-        "role": role,
-        "institution": institution,
-        "verified": False,
-        "request_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "status": "pending"
-    }
-    st.session_state.registration_requests.append(request)
-    return True, "Registration submitted for approval"
+# Run hash_fn(upload, total, progress) with a progress bar for big files
+def hash_with_progress(uploaded_file, hash_fn, label="Hashing"):
+    bar = st.progress(0.0, text=f"{label} {uploaded_file.name}...")
+    last_percent = [0]
 
-# Get user role badge
-def get_role_badge(role):
-    badges = {
-        "researcher": "🔬 Researcher",
-        "validator": "✅ Validator",
-        "auditor": "📋 Auditor",
-        "admin": "⚙️ Admin"
-    }
-    return badges.get(role, role)
+    def update(done, total):
+        percent = int(done * 100 / total) if total else 100
+        if percent != last_percent[0]:
+            last_percent[0] = percent
+            bar.progress(percent / 100, text=f"{label} {uploaded_file.name}... {percent}%")
 
-# Initialize blockchain and research nodes (as before)
-if 'blockchain' not in st.session_state:
-    st.session_state.blockchain = []
-    
-if 'research_nodes' not in st.session_state:
-    st.session_state.research_nodes = [
-        {
-            "id": "NODE-001",
-            "name": "Amazon Rainforest eDNA Station",
-            "type": "eDNA Sensor",
-            "location": "Manaus, Brazil",
-            "status": "active",
-            "last_submission": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "data_points": 1245,
-            "verified": True,
-            "node_address": "0x742d35Cc6634C0532925a3b844Bc454e4438f44e",
-            "stake": "32 ETH",
-            "owner": "researcher1"
-        },
-        {
-            "id": "NODE-002",
-            "name": "Mars Rover Telemetry", 
-            "type": "Space Telemetry",
-            "location": "Jezero Crater, Mars",
-            "status": "active",
-            "last_submission": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "data_points": 3567,
-            "verified": True,
-            "node_address": "0x8aB4F35Cc6634C0532925a3b844Bc454e4438f77a",
-            "stake": "48 ETH",
-            "owner": "researcher1"
-        },
-        {
-            "id": "NODE-003",
-            "name": "Pacific Ocean eDNA Array",
-            "type": "Marine eDNA", 
-            "location": "Great Barrier Reef",
-            "status": "active",
-            "last_submission": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "data_points": 892,
-            "verified": True,
-            "node_address": "0x9cD4F25Cc6634C0532925a3b844Bc454e4438f88b",
-            "stake": "24 ETH",
-            "owner": "researcher1"
-        }
-    ]
+    result = hash_fn(uploaded_file, total=uploaded_file.size, progress=update)
+    bar.empty()
+    return result
 
-# Smart Contract Configuration
-CONTRACT_ADDRESS = "0x1a2b3c4d5e6f7g8h9i0j1k2l3m4n5o6p7q8r9s0t"
+# SHA-256 of an upload. Each upload is hashed once; later reruns hit the shared digest cache.
+@timed()
+def hash_uploaded_file(uploaded_file):
+    cache_key = DigestCache.key_for(uploaded_file)
+    file_hash = digest_cache.get(cache_key)
+    if file_hash is None:
+        file_hash = hash_with_progress(uploaded_file, sha256_stream)
+        digest_cache.put(cache_key, file_hash)
+    return file_hash
 
-# Helper function to safely extract stake value
-def get_stake_value(stake_str):
-    try:
-        if stake_str and isinstance(stake_str, str):
-            return float(stake_str.split()[0])
-        return 0
-    except (ValueError, IndexError, AttributeError):
-        return 0
+# Content-defined chunks of an upload (the chunk_stream result: digest, size,
+# chunks), a few times slower than the plain hash, so only computed when the
+# chunks are needed. The session keeps the scan of its latest upload per purpose.
+@timed()
+def chunk_uploaded_file(uploaded_file, purpose):
+    cache_key = DigestCache.key_for(uploaded_file)
+    cached = st.session_state.chunk_scans.get(purpose)
+    if cached is not None and cached[0] == cache_key:
+        return cached[1]
+    scan = hash_with_progress(uploaded_file, chunk_stream, label="Chunking")
+    digest_cache.put(cache_key, scan["digest"])
+    st.session_state.chunk_scans[purpose] = (cache_key, scan)
+    return scan
 
-# Logout function
-def logout():
-    st.session_state.authenticated = False
-    st.session_state.current_user = None
-    st.session_state.user_role = None
-    st.session_state.login_time = None
-    st.rerun()
+# The most similar earlier version of an upload (same filename) and its chunk
+# diff, memoized until another manifest is recorded
+def closest_version(name, scan):
+    return frames.get(
+        ("closest_version", name, scan["digest"]), chunk_store.version(),
+        lambda: chunk_store.closest_version(name, scan["chunks"], scan["digest"]),
+    )
+
+# Queue a message that survives st.rerun(), so handlers can rerun right away
+# instead of sleeping to keep it on screen. kind: success/info/warning/error/toast.
+def flash(message, kind="success"):
+    st.session_state.flash_messages.append((kind, message))
+
+# Render and clear queued flash messages
+@timed()
+def show_flash_messages():
+    messages = st.session_state.flash_messages
+    st.session_state.flash_messages = []
+    for kind, message in messages:
+        if kind == "toast":
+            st.toast(message)
+        else:
+            getattr(st, kind)(message)
+
+# Page picker for a result set of `total` rows; returns (offset, page, pages)
+def page_selector(total, page_size, key):
+    pages = max(1, (total + page_size - 1) // page_size)
+    page = st.number_input("Page", min_value=1, max_value=pages, value=1, key=key) if pages > 1 else 1
+    return (page - 1) * page_size, page, pages
+
+# Date range filter as (since, until) ledger timestamp bounds; None = open-ended
+def date_range_filter(key):
+    col1, col2 = st.columns(2)
+    with col1:
+        start = st.date_input("From", value=None, key=f"{key}_from")
+    with col2:
+        end = st.date_input("To", value=None, key=f"{key}_to")
+    since = start.strftime("%Y-%m-%d") if start else None
+    until = (end + timedelta(days=1)).strftime("%Y-%m-%d") if end else None
+    return since, until
+
+# Ledger counts and page frames, memoized on the ledger version: an unchanged
+# rerun reads MAX(id) instead of running the filtered count and page queries
+def ledger_count(query, version):
+    return frames.get(("ledger_count",) + tuple(query.items()), version, lambda: ledger.count(**query))
+
+def ledger_page_frame(query, limit, offset, version):
+    return frames.get(
+        ("ledger_page", limit, offset) + tuple(query.items()), version,
+        lambda: pd.DataFrame(ledger.page(limit=limit, offset=offset, **query)),
+    )
+
+# Run a panel as a fragment: its own widgets rerun only the panel, not the
+# whole page. With live updates on (sidebar toggle) a live panel also reruns
+# itself every REFRESH_SECONDS, so viewers see new data without full reruns.
+def live_fragment(panel, live=True):
+    run_every = f"{REFRESH_SECONDS}s" if live and st.session_state.live_updates else None
+    st.fragment(panel, run_every=run_every)()
 
 # Login Page
+@timed()
 def show_login_page():
     col1, col2, col3 = st.columns([1, 2, 1])
     
@@ -479,13 +380,13 @@ def show_login_page():
                 go_to_register = st.form_submit_button("Register", use_container_width=True)
             
             if submit:
-                if authenticate_user(username, password):
+                if authenticate_user(accounts, username, password):
+                    user = accounts.get_user(username)
                     st.session_state.authenticated = True
                     st.session_state.current_user = username
-                    st.session_state.user_role = st.session_state.users_db[username]["role"]
+                    st.session_state.user_role = user["role"]
                     st.session_state.login_time = datetime.now()
-                    st.success(f"Welcome back, {st.session_state.users_db[username]['name']}!")
-                    time.sleep(1)
+                    flash(f"Welcome back, {user['name']}!", "toast")
                     st.rerun()
                 else:
                     st.error("Invalid username or password")
@@ -497,19 +398,20 @@ def show_login_page():
         st.markdown("---")
         st.markdown("#### Default Login Credentials:")
         
-        # Create a DataFrame for default users
-        default_users = pd.DataFrame([
+        # Create a DataFrame for default users (static, so built once per process)
+        default_users = frames.get("default_users", 0, lambda: pd.DataFrame([
             {"Role": "🔬 Researcher", "Username": "researcher1", "Password": "research123"},
             {"Role": "✅ Validator", "Username": "validator1", "Password": "validate123"},
             {"Role": "📋 Auditor", "Username": "auditor1", "Password": "audit123"},
             {"Role": "⚙️ Admin", "Username": "admin", "Password": "admin123"},
             {"Role": "👤 Demo User", "Username": "demo_user", "Password": "demo123"}
-        ])
+        ]))
         st.dataframe(default_users, use_container_width=True, hide_index=True)
         
         st.markdown("</div>", unsafe_allow_html=True)
 
 # Registration Page
+@timed()
 def show_register_page():
     col1, col2, col3 = st.columns([1, 2, 1])
     
@@ -548,11 +450,13 @@ def show_register_page():
                 if password != confirm_password:
                     st.error("Passwords do not match")
                 else:
-                    success, message = register_user(username, password, full_name, email, role, institution)
+                    success, message = register_user(
+                        accounts,
+                        username, password, full_name, email, role, institution
+                    )
                     if success:
-                        st.success(message)
-                        st.info("Your registration has been submitted for approval. You will be notified once verified.")
-                        time.sleep(2)
+                        flash(message)
+                        flash("Your registration has been submitted for approval. You will be notified once verified.", "info")
                         st.session_state.show_register = False
                         st.rerun()
                     else:
@@ -565,12 +469,15 @@ def show_register_page():
         st.markdown("</div>", unsafe_allow_html=True)
 
 # Main App (Authenticated)
+@timed()
 def show_main_app():
+    user = accounts.get_user(st.session_state.current_user)
+    
     # Logout button in sidebar
     with st.sidebar:
         st.markdown("---")
         st.markdown(f"### 👤 Logged in as:")
-        st.markdown(f"**{st.session_state.users_db[st.session_state.current_user]['name']}**")
+        st.markdown(f"**{user['name']}**")
         role = st.session_state.user_role
         role_display = {
             "researcher": "🔬 Researcher",
@@ -583,55 +490,27 @@ def show_main_app():
         if st.session_state.login_time:
             st.markdown(f"**Login time:** {st.session_state.login_time.strftime('%H:%M:%S')}")
         
+        st.toggle("🔄 Live updates", key="live_updates",
+                  help=f"Refresh the activity, audit and node panels every {REFRESH_SECONDS:g} seconds")
+        
         if st.button("🚪 Logout", use_container_width=True):
             logout()
     
     # Welcome banner
     st.markdown(f'''
     <div class="welcome-banner">
-        <h1>🔬 Welcome back, {st.session_state.users_db[st.session_state.current_user]['name']}!</h1>
+        <h1>🔬 Welcome back, {user['name']}!</h1>
         <p>You are logged in as <strong>{role_display}</strong> • {datetime.now().strftime("%B %d, %Y")}</p>
     </div>
     ''', unsafe_allow_html=True)
     
-    # Network metrics
-    active_nodes = sum(1 for node in st.session_state.research_nodes if node.get("status") == "active")
-    total_data_points = sum(node.get("data_points", 0) for node in st.session_state.research_nodes)
-    
-    total_stake = 0
-    for node in st.session_state.research_nodes:
-        stake_value = get_stake_value(node.get("stake", "0 ETH"))
-        total_stake += stake_value
-    
-    # Metrics row
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        with st.container():
-            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            st.metric("Total Nodes", len(st.session_state.research_nodes))
-            st.markdown('</div>', unsafe_allow_html=True)
-    
-    with col2:
-        with st.container():
-            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            st.metric("Active Nodes", active_nodes)
-            st.markdown('</div>', unsafe_allow_html=True)
-    
-    with col3:
-        with st.container():
-            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            st.metric("Data Points", total_data_points)
-            st.markdown('</div>', unsafe_allow_html=True)
-    
-    with col4:
-        with st.container():
-            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            st.metric("Total Stake", f"{total_stake:.1f} ETH")
-            st.markdown('</div>', unsafe_allow_html=True)
+    show_network_metrics()
     
     # Role-based tabs
     if st.session_state.user_role == "admin":
         tabs = ["📊 Dashboard", "🔗 Data Anchoring", "🔍 Verification", "📡 Nodes", "👥 User Management", "📊 Architecture"]
+        if METRICS_ENABLED:
+            tabs.append("⏱️ Performance")
     elif st.session_state.user_role == "validator":
         tabs = ["📊 Dashboard", "🔍 Verification", "📡 Nodes", "📊 Architecture"]
     elif st.session_state.user_role == "auditor":
@@ -652,25 +531,28 @@ def show_main_app():
         with tab_objects[2]:
             show_verification()
         with tab_objects[3]:
-            show_nodes()
+            live_fragment(show_nodes)
         with tab_objects[4]:
             show_user_management()
         with tab_objects[5]:
             show_architecture()
+        if METRICS_ENABLED:
+            with tab_objects[6]:
+                show_performance()
     
     elif st.session_state.user_role == "validator":
         with tab_objects[1]:
             show_verification()
         with tab_objects[2]:
-            show_nodes()
+            live_fragment(show_nodes)
         with tab_objects[3]:
             show_architecture()
     
     elif st.session_state.user_role == "auditor":
         with tab_objects[1]:
-            show_audit_log()
+            live_fragment(show_audit_log)
         with tab_objects[2]:
-            show_nodes()
+            live_fragment(show_nodes)
         with tab_objects[3]:
             show_architecture()
     
@@ -684,178 +566,530 @@ def show_main_app():
         with tab_objects[4]:
             show_architecture()
 
-# Dashboard function
+# Network metrics row (running totals kept by the node registry)
+@timed()
+def show_network_metrics():
+    nodes = research_nodes
+    active_nodes = nodes.active_count
+    total_data_points = nodes.total_data_points
+    total_stake = nodes.total_stake
+    
+    # Metrics row
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        with st.container():
+            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
+            st.metric("Total Nodes", len(nodes))
+            st.markdown('</div>', unsafe_allow_html=True)
+    
+    with col2:
+        with st.container():
+            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
+            st.metric("Active Nodes", active_nodes)
+            st.markdown('</div>', unsafe_allow_html=True)
+    
+    with col3:
+        with st.container():
+            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
+            st.metric("Data Points", total_data_points)
+            st.markdown('</div>', unsafe_allow_html=True)
+    
+    with col4:
+        with st.container():
+            st.markdown('<div class="metric-card">', unsafe_allow_html=True)
+            st.metric("Total Stake", f"{total_stake:.1f} ETH")
+            st.markdown('</div>', unsafe_allow_html=True)
+
+# Dashboard function. Both panels are fragments, so the activity feed can
+# refresh itself without rerunning the page (or redrawing the pie chart).
+@timed()
 def show_dashboard():
     st.markdown("## Network Overview")
     
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown("### Node Distribution by Type")
-        node_df = pd.DataFrame(st.session_state.research_nodes)
-        if not node_df.empty and 'type' in node_df.columns:
-            node_types = node_df["type"].value_counts().reset_index()
+        live_fragment(show_node_distribution, live=False)
+    
+    with col2:
+        live_fragment(show_recent_activity)
+    
+    live_fragment(show_ledger_activity, live=False)
+    live_fragment(show_network_activity)
+
+@timed()
+def show_node_distribution():
+    st.markdown("### Node Distribution by Type")
+    # The frame is only read when the pie is rebuilt, i.e. after nodes were added
+    # or edited; pushed telemetry leaves research_nodes.version alone
+    if research_nodes.count():
+        # Plotly is only needed for the dashboard and architecture charts, so load it on first use
+        import plotly.express as px
+        def build_pie():
+            node_types = node_frames.aggregate("type_counts", lambda df: df["type"].value_counts().reset_index())
             node_types.columns = ['Type', 'Count']
-            fig = px.pie(node_types, values='Count', names='Type', 
-                         color_discrete_sequence=px.colors.sequential.Blues_r)
-            st.plotly_chart(fig, use_container_width=True)
+            return px.pie(node_types, values='Count', names='Type',
+                          color_discrete_sequence=px.colors.sequential.Blues_r)
+        fig = frames.get("dashboard_pie", research_nodes.version, build_pie)
+        st.plotly_chart(fig, use_container_width=True)
+
+# Latest ledger records. On a live refresh with no new records this is a
+# MAX(id) query and a memo hit.
+@timed()
+def show_recent_activity():
+    st.markdown("### Recent Activity")
+    def build_activity():
+        return pd.DataFrame([{
+            "Time": tx.get("timestamp", ""),
+            "Node": tx.get("node", "Unknown")[:15] + "...",
+            "Type": tx.get("data_type", "Unknown")
+        } for tx in ledger.recent(5)])
+    activity_df = frames.get("recent_activity", ledger.version(), build_activity)
     
+    if not activity_df.empty:
+        st.dataframe(activity_df, use_container_width=True)
+    else:
+        st.info("No recent activity")
+
+# Hourly points sent to the browser per activity chart, whatever the period
+CHART_POINTS = 500
+
+# Records anchored per hour over a period, overall or for one submitter
+@timed()
+def show_ledger_activity():
+    st.markdown("### Ledger Activity")
+    periods = {"Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90, "All time": None}
+    version = ledger.version()
+    col1, col2 = st.columns(2)
+    with col1:
+        period = st.selectbox("Period", list(periods), index=1, key="activity_period")
     with col2:
-        st.markdown("### Recent Activity")
-        activity_data = []
-        for i in range(min(5, len(st.session_state.blockchain))):
-            tx = st.session_state.blockchain[-(i+1)]
-            activity_data.append({
-                "Time": tx.get("timestamp", ""),
-                "Node": tx.get("node", "Unknown")[:15] + "...",
-                "Type": tx.get("data_type", "Unknown")
-            })
-        
-        if activity_data:
-            st.dataframe(pd.DataFrame(activity_data), use_container_width=True)
-        else:
-            st.info("No recent activity")
+        submitters = frames.get("activity_nodes", version, ledger.activity_nodes)
+        node = st.selectbox("Submitter", [None] + submitters, format_func=lambda n: "All" if n is None else n,
+                            key="activity_node")
+    
+    # The period and the zero-fill run up to the current hour, so the chart also
+    # goes stale when the hour turns, not only when the ledger changes
+    current_hour = datetime.now().strftime("%Y-%m-%d %H")
+    fig, hours = frames.get(("ledger_activity", node, period), (version, current_hour),
+                            lambda: build_activity_chart(node, periods[period]))
+    if fig is None:
+        st.info("No activity in this period")
+    else:
+        st.plotly_chart(fig, use_container_width=True)
+        if hours > CHART_POINTS:
+            st.caption(f"{hours:,} hours, downsampled to {CHART_POINTS} points")
+
+# Hourly record counts from the ledger's rollup, zero-filled up to the current
+# hour and cut down to CHART_POINTS with LTTB, which keeps the peaks. Returns
+# the figure and the number of hours it covers; (None, 0) if there is nothing to show.
+def build_activity_chart(node, days):
+    since = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d %H") if days else None
+    rows = ledger.hourly_activity(node=node, since=since)
+    if not rows:
+        return None, 0
+    counts = pd.Series([c for _, c in rows], index=pd.to_datetime([h for h, _ in rows], format="%Y-%m-%d %H"))
+    now = pd.Timestamp(datetime.now()).floor("h")
+    start = pd.Timestamp(since) if since else counts.index[0]
+    hours = pd.date_range(start, max(now, counts.index[-1]), freq="h")
+    values = counts.reindex(hours, fill_value=0).to_numpy()
+    kept = lttb(values, CHART_POINTS)
+    import plotly.graph_objects as go
+    fig = go.Figure(go.Scatter(x=hours[kept], y=values[kept], mode="lines", line=dict(color="#1E88E5", width=1.5)))
+    fig.update_layout(height=300, margin=dict(l=10, r=10, t=10, b=10), yaxis_title="Records per hour")
+    return fig, len(hours)
+
+# Live submission rates from node telemetry: fleet totals over the last five
+# minutes, the last hour per minute, and the busiest nodes
+@timed()
+def show_network_activity():
+    st.markdown("### Network Activity")
+    if not len(telemetry):
+        st.info("No node telemetry yet")
+        return
+    
+    # Windows slide each minute, so the memo goes stale on new events or a new minute
+    def build_network_activity():
+        summary = telemetry.summary(minutes=5)
+        starts, submissions, _ = telemetry.fleet_series()
+        series = pd.DataFrame({"Submissions": submissions}, index=pd.DatetimeIndex(starts, name="Minute"))
+        busiest = pd.DataFrame([{
+            "Node": node_id,
+            "Submissions / min": round(rate, 2),
+            "KiB / min": round(byte_rate / 1024, 1)
+        } for node_id, rate, byte_rate in summary["busiest"]])
+        return summary, series, busiest
+    summary, series, busiest = frames.get(
+        "network_activity", (telemetry.version, datetime.now().strftime("%Y-%m-%d %H:%M")), build_network_activity
+    )
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Active Nodes (5 min)", f"{summary['active_nodes']} of {summary['reporting_nodes']}")
+    col2.metric("Submissions / min", f"{summary['submissions_per_minute']:,.1f}")
+    col3.metric("Data / min", f"{summary['bytes_per_minute'] / 1024 / 1024:,.2f} MiB")
+    
+    st.line_chart(series, height=200)
+    if not busiest.empty:
+        st.dataframe(busiest, use_container_width=True, hide_index=True)
 
 # Data Anchoring function
+@timed()
 def show_data_anchoring():
     st.markdown("## Anchor Data to Blockchain")
     st.markdown('<div class="info-box">📝 Upload your research data to create an immutable record.</div>', unsafe_allow_html=True)
+    status_area = st.container()
+    
+    mode = st.radio("Mode", ["Single file", "Bulk"], horizontal=True, key="anchoring_mode")
+    if mode == "Bulk":
+        show_bulk_anchoring()
+    else:
+        show_single_anchoring()
     
+    # Started after the handlers above, so a job queued in this run is polled right away
+    if st.session_state.watched_jobs or st.session_state.awaiting_confirmation:
+        with status_area:
+            st.fragment(show_job_status, run_every="2s")()
+
+@timed()
+def show_single_anchoring():
     uploaded_file = st.file_uploader("Choose a file", type=['csv', 'json', 'txt', 'pdf', 'jpg', 'png'])
     
     if uploaded_file is not None:
-        file_bytes = uploaded_file.getvalue()
-        file_hash = hashlib.sha256(file_bytes).hexdigest()
+        file_hash = hash_uploaded_file(uploaded_file)
         
         col1, col2 = st.columns(2)
         with col1:
             st.markdown("#### File Details:")
             st.write(f"**Filename:** {uploaded_file.name}")
-            st.write(f"**Size:** {len(file_bytes) / 1024:.2f} KB")
+            st.write(f"**Size:** {uploaded_file.size / 1024:.2f} KB")
         
         with col2:
             st.markdown("#### SHA-256 Hash:")
             st.code(file_hash[:50] + "...", language="text")
         
-        if st.button("🔗 Anchor to Blockchain", use_container_width=True):
-            transaction = {
-                "transaction_hash": f"0x{hashlib.sha256(f'{random.random()}{time.time()}'.encode()).hexdigest()}",
-                "block_number": random.randint(1000000, 2000000),
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "node": st.session_state.current_user,
-                "data_type": "Research Data",
-                "data_hash": file_hash,
-                "filename": uploaded_file.name,
-                "status": "confirmed"
-            }
-            st.session_state.blockchain.append(transaction)
-            st.success("✅ Data anchored successfully!")
-            st.balloons()
+        col_a, col_b = st.columns(2)
+        with col_a:
+            add_to_batch = st.button("➕ Add to Batch", use_container_width=True)
+        with col_b:
+            anchor_now = st.button("🔗 Anchor to Blockchain", use_container_width=True)
+        
+        if add_to_batch or anchor_now:
+            # Chunked only once the user anchors, compared with the previous version before recording
+            scan = chunk_uploaded_file(uploaded_file, "anchor")
+            previous = closest_version(uploaded_file.name, scan)
+            if previous:
+                info, diff = previous
+                new_bytes = sum(length for _, length in diff["changed"])
+                st.caption(f"🧩 {len(scan['chunks'])} chunks • {diff['unchanged_chunks']} unchanged since the version "
+                           f"recorded {info['created_at']}, so only {new_bytes / 1024:.1f} KB is new")
+            else:
+                st.caption(f"🧩 {len(scan['chunks'])} chunks")
+            chunk_store.record(file_hash, uploaded_file.name, scan["chunks"])
+            ledger.add_pending(file_hash, uploaded_file.name, st.session_state.current_user)
+            if anchor_now or ledger.pending_count() >= MAX_BATCH_SIZE:
+                enqueue_seal()
+                st.balloons()
+            else:
+                st.success("Added to the pending batch")
+    
+    # Files queued with "Add to Batch" share one anchored Merkle root
+    pending = ledger.pending_count()
+    if pending:
+        st.info(f"⏳ {pending} file(s) waiting in the pending batch")
+        if st.button("⛓️ Anchor Pending Batch", use_container_width=True):
+            enqueue_seal()
+
+# Sealing and submission run as background jobs (see get_job_queue); the
+# session only queues them and follows their progress in show_job_status
+def enqueue_job(kind, payload):
+    job_id = jobs.enqueue(kind, payload, st.session_state.current_user)
+    st.session_state.watched_jobs.append(job_id)
+    return job_id
+
+def enqueue_seal():
+    job_id = enqueue_job("seal", {"sealed_by": st.session_state.current_user})
+    st.success(f"✅ Batch queued for anchoring as job #{job_id}")
+
+# Progress of this session's jobs and their chain transactions. Runs as a
+# fragment every few seconds, so polling doesn't rerun the whole page; a full
+# rerun happens only once something finishes, to show the result and refresh tables.
+@timed()
+def show_job_status():
+    finished = False
+    watched_jobs = []
+    for job_id in st.session_state.watched_jobs:
+        job = jobs.get(job_id)
+        if job is None:
+            # Purged, or the queue moved (DESCIENCE_JOBS_PATH changed); stop following it
+            continue
+        result = job["result"]
+        if job["status"] in ("queued", "running"):
+            watched_jobs.append(job_id)
+            retry = f" • retrying after: {job['error']}" if job["error"] else ""
+            st.caption(f"⏳ Job #{job_id} {job['status']}{retry}")
+        elif job["status"] == "failed":
+            finished = True
+            flash(f"Job #{job_id} failed after {job['attempts']} attempts: {job['error']}", "error")
+        elif "seal_job" in result:
+            # Hashing finished; follow the seal job it queued
+            watched_jobs.append(result["seal_job"])
+            st.caption(f"⏳ Job #{job_id} hashed {result['files']} file(s), sealing as job #{result['seal_job']}")
+        elif result["files"]:
+            st.session_state.awaiting_confirmation.append(result["transaction_hash"])
+        else:
+            finished = True
+            flash(f"Job #{job_id}: nothing left to anchor, the batch was already sealed", "info")
+    st.session_state.watched_jobs = watched_jobs
+    
+    awaiting = []
+    for tx_hash in st.session_state.awaiting_confirmation:
+        status = ledger.transaction_status(tx_hash)
+        if status is None or status[0] == "pending":
+            awaiting.append(tx_hash)
+            st.caption(f"⏳ Transaction {tx_hash[:18]}... waiting for a block")
+        elif status[0] == "confirmed":
+            finished = True
+            flash(f"Anchor confirmed in block {status[1]} (transaction {tx_hash[:18]}...)")
+        else:
+            finished = True
+            flash(f"Anchor transaction {tx_hash[:18]}... failed in block {status[1]}", "error")
+    st.session_state.awaiting_confirmation = awaiting
+    if finished:
+        st.rerun()
+
+# Bulk anchoring: many uploads, zip archives or (admin only) a server-side directory,
+# hashed in parallel and anchored as a single Merkle batch
+@timed()
+def show_bulk_anchoring():
+    uploaded_files = st.file_uploader(
+        "Choose files or zip archives",
+        type=['csv', 'json', 'txt', 'pdf', 'jpg', 'png', 'zip'],
+        accept_multiple_files=True,
+        key="bulk_upload"
+    )
+    
+    directory = ""
+    if st.session_state.user_role == "admin":
+        directory = st.text_input("...or a server-side directory", placeholder="/data/sensor-output/2024-06-01")
+    
+    if not uploaded_files and not directory:
+        return
+    
+    if st.button("🔗 Anchor All to Blockchain", use_container_width=True, key="bulk_anchor"):
+        if directory and not os.path.isdir(directory):
+            st.error(f"Directory not found: {directory}")
+            return
+        
+        if directory:
+            # Server-side directories can be large, so even hashing runs as a job
+            job_id = enqueue_job("anchor_directory", {"directory": directory, "node": st.session_state.current_user})
+            st.success(f"✅ Directory queued for hashing and anchoring as job #{job_id}")
+        if not uploaded_files:
+            return
+        
+        with st.spinner("Hashing files in parallel..."):
+            result = hash_entries(upload_entries(uploaded_files))
+        files = result["files"]
+        if not files:
+            st.warning("No files to anchor")
+            return
+        
+        ledger.add_pending_many([(data_hash, name) for name, data_hash, _ in files], st.session_state.current_user)
+        enqueue_seal()
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Files", len(files))
+        with col2:
+            st.metric("Total Size", f"{result['total_bytes'] / 1024 / 1024:.2f} MB")
+        with col3:
+            st.metric("Throughput", f"{result['bytes_per_second'] / 1024 / 1024:.1f} MB/s")
+        st.dataframe(
+            pd.DataFrame([{"File": name, "SHA-256": data_hash, "Bytes": size} for name, data_hash, size in files]),
+            use_container_width=True
+        )
 
 # Verification function
+@timed()
 def show_verification():
     st.markdown("## Verify Data Integrity")
     verify_file = st.file_uploader("Upload file to verify", type=['csv', 'json', 'txt', 'pdf', 'jpg', 'png'], key="verify")
     
     if verify_file is not None:
-        verify_bytes = verify_file.getvalue()
-        verify_hash = hashlib.sha256(verify_bytes).hexdigest()
+        verify_hash = hash_uploaded_file(verify_file)
         
         st.markdown("#### File Hash:")
         st.code(verify_hash, language="text")
         
-        found = False
-        for tx in st.session_state.blockchain:
-            if tx.get("data_hash") == verify_hash:
-                found = True
+        results = verify_data_hash(ledger, verify_hash)
+        verified = [tx for tx, ok in results if ok]
+        if verified:
+            if "merkle_proof" in verified[0]:
+                st.success("✅ Data verified! Merkle proof checks out against an anchored batch root")
+            else:
                 st.success("✅ Data verified! Record found on blockchain")
-                st.json(tx)
-                break
-        
-        if not found:
+            if verified[0].get("status") == "pending":
+                st.info("⏳ Its anchor transaction is still waiting for a block")
+            st.json(verified[0])
+            if len(results) > 1:
+                with st.expander(f"All {len(results)} anchors of this hash"):
+                    st.dataframe(pd.DataFrame([tx for tx, _ in results]), use_container_width=True)
+        elif any(anchor_failed(tx) for tx, _ in results):
+            st.error("❌ Record found, but its anchor transaction failed on chain, so the data was never anchored")
+        elif results:
+            st.error("❌ Record found, but its Merkle proof does not match an anchored root")
+        else:
             st.error("❌ Data not found on blockchain")
+        
+        # Chunked only on a miss, to show what changed since a recorded version
+        if not verified:
+            show_version_diff(verify_file.name, chunk_uploaded_file(verify_file, "verify"))
+
+# Which parts of an unverified file differ from its closest recorded version
+@timed()
+def show_version_diff(name, scan):
+    previous = closest_version(name, scan)
+    if previous is None:
+        return
+    info, diff = previous
+    anchored = any(ok for _, ok in verify_data_hash(ledger, info["data_hash"]))
+    st.warning(
+        f"🧩 Closest {'anchored' if anchored else 'recorded (not yet anchored)'} version of {name}: "
+        f"{info['data_hash'][:16]}... from {info['created_at']}. "
+        f"{diff['unchanged_chunks']} of {len(scan['chunks'])} chunks unchanged "
+        f"({diff['unchanged_bytes'] * 100 / max(scan['size'], 1):.1f}% of bytes); "
+        f"{diff['removed_chunks']} chunk(s) of that version are gone"
+    )
+    if diff["changed"]:
+        st.dataframe(
+            pd.DataFrame([{"Offset": offset, "Length": length, "End": offset + length} for offset, length in diff["changed"]]),
+            use_container_width=True, hide_index=True
+        )
 
 # My Data function
+@timed()
 def show_my_data():
     st.markdown("## My Data Submissions")
     
-    my_data = [tx for tx in st.session_state.blockchain if tx.get("node") == st.session_state.current_user]
+    since, until = date_range_filter("my_data")
+    query = {"node": st.session_state.current_user, "since": since, "until": until}
+    version = ledger.version()
+    total = ledger_count(query, version)
     
-    if my_data:
-        df = pd.DataFrame(my_data)
+    if total:
+        page_size = 100
+        offset, page, pages = page_selector(total, page_size, key="my_data_page")
+        st.caption(f"{total} submissions • page {page} of {pages}")
+        df = ledger_page_frame(query, page_size, offset, version)
         st.dataframe(df, use_container_width=True)
     else:
         st.info("You haven't submitted any data yet")
 
 # My Nodes function
+@timed()
 def show_my_nodes():
     st.markdown("## My Research Nodes")
     
     if st.button("➕ Register New Node", use_container_width=True):
-        new_node = {
-            "id": f"NODE-{random.randint(100, 999)}",
-            "name": f"Personal Node {random.randint(1, 100)}",
-            "type": "Research Node",
-            "location": "Field Station",
-            "status": "pending",
-            "last_submission": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "data_points": 0,
-            "verified": False,
-            "node_address": f"0x{hashlib.sha256(str(random.random()).encode()).hexdigest()[:40]}",
-            "stake": "10 ETH",
-            "owner": st.session_state.current_user
-        }
-        st.session_state.research_nodes.append(new_node)
-        st.success("Node registration submitted for verification!")
-        time.sleep(1)
+        register_node(research_nodes, st.session_state.current_user)
+        flash("Node registration submitted for verification!")
         st.rerun()
 
 # Audit Log function
+@timed()
 def show_audit_log():
     st.markdown("## System Audit Log")
     
+    page_size = 25
     col1, col2 = st.columns(2)
     with col1:
         st.markdown("### Pending Verifications")
-        pending_nodes = [n for n in st.session_state.research_nodes if not n.get("verified")]
-        if pending_nodes:
-            st.dataframe(pd.DataFrame(pending_nodes))
+        nodes = research_nodes
+        pending_total = nodes.count({"verified": False})
+        if pending_total:
+            offset, page, pages = page_selector(pending_total, page_size, key="audit_pending_page")
+            st.caption(f"{pending_total} pending nodes • page {page} of {pages}")
+            st.dataframe(frames.get(
+                ("pending_nodes", offset, page_size), nodes.version,
+                lambda: pd.DataFrame(nodes.query({"verified": False}, offset=offset, limit=page_size)[0]),
+            ))
         else:
             st.info("No pending verifications")
     
     with col2:
         st.markdown("### Recent Activity")
-        if st.session_state.blockchain:
-            recent = st.session_state.blockchain[-10:]
-            st.dataframe(pd.DataFrame(recent))
+        since, until = date_range_filter("audit")
+        submitter = st.text_input("Submitter", placeholder="Any", key="audit_submitter") or None
+        query = {"node": submitter, "since": since, "until": until}
+        version = ledger.version()
+        total = ledger_count(query, version)
+        if total:
+            offset, page, pages = page_selector(total, page_size, key="audit_activity_page")
+            st.caption(f"{total} records • page {page} of {pages}")
+            st.dataframe(ledger_page_frame(query, page_size, offset, version))
+        else:
+            st.info("No matching activity")
+    
+    st.markdown("### Export")
+    col1, col2 = st.columns(2)
+    # Files are built only when a button is clicked
+    with col1:
+        st.download_button("⬇️ Ledger (Parquet)", lambda: export_parquet("ledger"),
+                           file_name="descience_ledger.parquet", mime="application/vnd.apache.parquet",
+                           key="export_ledger", use_container_width=True)
+    with col2:
+        st.download_button("⬇️ Nodes (Parquet)", lambda: export_parquet("nodes"),
+                           file_name="descience_nodes.parquet", mime="application/vnd.apache.parquet",
+                           key="export_nodes", use_container_width=True)
+
+# Columnar export for analysts, as Parquet bytes for a download button
+def export_parquet(what):
+    # pyarrow is only needed for exports, so load it on first use
+    from descience.columnar import export_ledger, export_nodes
+    buffer = io.BytesIO()
+    if what == "ledger":
+        export_ledger(ledger, buffer)
+    else:
+        export_nodes(research_nodes, buffer)
+    return buffer.getvalue()
 
 # User Management function (admin only)
+@timed()
 def show_user_management():
     st.markdown("## User Management")
     
     tab1, tab2 = st.tabs(["👥 Registered Users", "📝 Pending Registrations"])
     
+    page_size = 50
     with tab1:
         st.markdown("### Registered Users")
-        users_data = []
-        for username, data in st.session_state.users_db.items():
-            users_data.append({
-                "Username": username,
+        role = st.selectbox("Role", [None, "researcher", "validator", "auditor", "admin"],
+                            format_func=lambda r: "All" if r is None else get_role_badge(r), key="users_role")
+        version = accounts.version()
+        total = frames.get(("user_count", role), version, lambda: accounts.count_users(role=role))
+        offset, page, pages = page_selector(total, page_size, key="users_page")
+        def build_users():
+            return pd.DataFrame([{
+                "Username": data["username"],
                 "Name": data.get("name", ""),
                 "Email": data.get("email", ""),
                 "Role": data.get("role", ""),
                 "Verified": "✅" if data.get("verified") else "❌",
-                "Last Login": data.get("last_login", "Never")
-            })
+                "Last Login": data.get("last_login") or "Never"
+            } for data in accounts.users_page(limit=page_size, offset=offset, role=role)])
+        df = frames.get(("users", role, offset, page_size), version, build_users)
         
-        if users_data:
-            df = pd.DataFrame(users_data)
+        if not df.empty:
+            st.caption(f"{total} users • page {page} of {pages}")
             st.dataframe(df, use_container_width=True)
     
     with tab2:
         st.markdown("### Pending Registration Requests")
-        if st.session_state.registration_requests:
-            for req in st.session_state.registration_requests:
+        pending_total = accounts.count_pending()
+        if pending_total:
+            offset, page, pages = page_selector(pending_total, page_size, key="requests_page")
+            st.caption(f"{pending_total} pending requests • page {page} of {pages}")
+            for req in accounts.pending_requests(limit=page_size, offset=offset):
                 with st.container():
                     col1, col2, col3 = st.columns([3, 1, 1])
                     with col1:
@@ -864,37 +1098,63 @@ def show_user_management():
                         st.markdown(f"📅 {req['request_date']}")
                     with col2:
                         if st.button("✅ Approve", key=f"approve_{req['username']}"):
-                            # Add to users database
-                            st.session_state.users_db[req['username']] = {
-                                "password": req['password'],
-                                "name": req['name'],
-                                "email": req['email'],
-                                "role": req['role'],
-                                "institution": req['institution'],
-                                "verified": True,
-                                "created_at": req['request_date'],
-                                "last_login": None
-                            }
-                            # Remove from requests
-                            st.session_state.registration_requests.remove(req)
-                            st.success(f"User {req['username']} approved!")
-                            time.sleep(1)
+                            if accounts.approve(req['username']):
+                                flash(f"User {req['username']} approved!")
+                            else:
+                                flash(f"Request from {req['username']} was already handled", "info")
                             st.rerun()
                     with col3:
                         if st.button("❌ Reject", key=f"reject_{req['username']}"):
-                            st.session_state.registration_requests.remove(req)
-                            st.warning(f"User {req['username']} rejected")
-                            time.sleep(1)
+                            if accounts.reject(req['username']):
+                                flash(f"User {req['username']} rejected", "warning")
+                            else:
+                                flash(f"Request from {req['username']} was already handled", "info")
                             st.rerun()
                     st.markdown("---")
         else:
             st.info("No pending registration requests")
 
-# Nodes function
+# Nodes function (filtered and paged by the registry; only the visible page is rendered)
+@timed()
 def show_nodes():
     st.markdown("## Research Nodes")
+    nodes = research_nodes
+    
+    # Selectboxes for the small value sets; owners grow with the fleet, so the
+    # owner filter is typed (an exact match on the owner index)
+    filters = {}
+    filter_cols = st.columns(4)
+    for col, (field, label) in zip(filter_cols, [("status", "Status"), ("type", "Type"), ("owner", "Owner"), ("verified", "Verified")]):
+        with col:
+            if field == "owner":
+                filters[field] = st.text_input(label, placeholder="Any", key="nodes_filter_owner").strip() or None
+                continue
+            options = [None] + nodes.values(field)
+            filters[field] = st.selectbox(
+                label, options, key=f"nodes_filter_{field}",
+                format_func=lambda v: "All" if v is None else ("Yes" if v is True else "No" if v is False else str(v))
+            )
     
-    for node in st.session_state.research_nodes:
+    sort_options = {"Registration": None, "Name": "name", "Data points": "data_points", "Stake": "stake", "Last submission": "last_submission"}
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        sort_label = st.selectbox("Sort by", list(sort_options), key="nodes_sort")
+    with col2:
+        descending = st.checkbox("Descending", key="nodes_descending")
+    with col3:
+        page_size = st.selectbox("Per page", [10, 25, 50, 100], index=1, key="nodes_page_size")
+    
+    # count() and query() share the registry's memoized filter result, so the
+    # filter runs once per registry version, not twice per rerun
+    total = nodes.count(filters)
+    offset, page, pages = page_selector(total, page_size, key="nodes_page")
+    page_nodes, total = nodes.query(
+        filters, sort_by=sort_options[sort_label], descending=descending,
+        offset=offset, limit=page_size
+    )
+    st.caption(f"{total} matching nodes • page {page} of {pages}")
+    
+    for node in page_nodes:
         with st.container():
             status_color = "🟢" if node.get("status") == "active" else "🟡"
             verified = "✅" if node.get("verified") else "⏳"
@@ -904,14 +1164,47 @@ def show_nodes():
                 st.markdown(f"{verified} **{node.get('name')}** {status_color}")
                 st.markdown(f"📍 {node.get('location')} | 📊 {node.get('data_points')} data points")
             with col2:
-                st.markdown(f"**Stake:** {node.get('stake')}")
+                st.markdown(f"**Stake:** {format_stake(node.get('stake'))}")
             st.markdown("---")
 
+# Performance function (admin only, with DESCIENCE_METRICS=1): slowest
+# sections and counters of this server process since it started
+@timed()
+def show_performance():
+    st.markdown("## Performance")
+    
+    counters = metrics.counters()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Logins", counters.get("logins", 0))
+    col2.metric("Failed Logins", counters.get("login_failures", 0))
+    col3.metric("Files Anchored", counters.get("anchored_files", 0))
+    col4.metric("Data Hashed", f"{counters.get('bytes_hashed', 0) / 1024 / 1024:,.1f} MiB")
+    
+    st.markdown("### Slowest Sections")
+    sort_options = {"Total time": "total", "Slowest call": "max", "Mean time": "mean"}
+    sort_label = st.selectbox("Sort by", list(sort_options), key="performance_sort")
+    sections = sorted(metrics.sections(), key=lambda r: r[sort_options[sort_label]], reverse=True)
+    if sections:
+        st.dataframe(pd.DataFrame([{
+            "Section": r["name"],
+            "Calls": r["count"],
+            "Total (s)": round(r["total"], 3),
+            "Mean (ms)": round(r["mean"] * 1000, 2),
+            "Max (ms)": round(r["max"] * 1000, 2)
+        } for r in sections]), use_container_width=True, hide_index=True)
+    else:
+        st.info("Nothing timed yet")
+    
+    st.download_button("⬇️ Prometheus metrics", lambda: metrics.prometheus(),
+                       file_name="descience_metrics.prom", mime="text/plain", key="export_metrics")
+
 # Architecture function
+@timed()
 def show_architecture():
     st.markdown("## System Architecture")
     
     # Flow diagram
+    import plotly.graph_objects as go
     fig = go.Figure()
     
     nodes = ["Edge Device", "Data Hash", "Verified Node", "Smart Contract", "Blockchain"]
@@ -953,17 +1246,17 @@ def show_architecture():
         - Monitor network
         """)
 
-# Main app logic
-if 'show_register' not in st.session_state:
-    st.session_state.show_register = False
-
-if not st.session_state.authenticated:
-    if st.session_state.show_register:
-        show_register_page()
+# Main app logic (timed as a whole too, to compare the sections against)
+with span("script_run"):
+    show_flash_messages()
+    
+    if not st.session_state.authenticated:
+        if st.session_state.show_register:
+            show_register_page()
+        else:
+            show_login_page()
     else:
-        show_login_page()
-else:
-    show_main_app()
+        show_main_app()
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,46 @@
+import hashlib
+
+from descience.anchoring import anchor_files, verify_data_hash
+from descience.ledger import LedgerStore
+
+
+class FakeChain:
+    def send_anchors(self, hashes):
+        return [f"0x{hashlib.sha256(h.encode()).hexdigest()}" for h in hashes]
+
+
+def test_failed_anchor_transaction_does_not_verify(tmp_path):
+    store = LedgerStore(str(tmp_path / "ledger.db"))
+    data_hash = hashlib.sha256(b"sample").hexdigest()
+    records = anchor_files(store, [("sample.csv", data_hash, 6)], "researcher1", FakeChain())
+    assert [ok for _, ok in verify_data_hash(store, data_hash)] == [True]
+
+    store.confirm([(records[0]["transaction_hash"], 7, False)])
+
+    results = verify_data_hash(store, data_hash)
+    assert results and not any(ok for _, ok in results)
+    assert results[0][0]["status"] == "failed"
+
+
+def test_failed_root_record_fails_batched_files(tmp_path):
+    store = LedgerStore(str(tmp_path / "ledger.db"))
+    hashes = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(3)]
+    records = anchor_files(store, [(f"f{i}", h, 1) for i, h in enumerate(hashes)], "researcher1", FakeChain())
+    # Only the root record failed; the file records still look pending
+    store._conn().execute(
+        "UPDATE transactions SET status = 'failed' WHERE data_hash = ?", (records[0]["data_hash"],)
+    )
+    store._conn().commit()
+
+    assert not any(ok for _, ok in verify_data_hash(store, hashes[1]))
+
+
+def test_anchor_files_leaves_the_shared_queue_alone(tmp_path):
+    store = LedgerStore(str(tmp_path / "ledger.db"))
+    store.add_pending(hashlib.sha256(b"queued").hexdigest(), "queued.csv", "researcher2")
+    data_hash = hashlib.sha256(b"mine").hexdigest()
+
+    records = anchor_files(store, [("mine.csv", data_hash, 4)], "researcher1", FakeChain())
+
+    assert [r["data_hash"] for r in records[1:]] == [data_hash]
+    assert store.pending_count() == 1
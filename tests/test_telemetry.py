@@ -0,0 +1,44 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from descience.nodes import NodeRegistry, default_nodes
+from descience.telemetry import NodeTelemetry, parse_events, serve
+
+
+def test_parse_events_coerces_timestamps():
+    events = parse_events(json.dumps([{"node": "NODE-001", "bytes": 10, "timestamp": "1700000000.5"}]))
+    assert events == [("NODE-001", 10, 1, 1700000000.5)]
+
+
+@pytest.mark.parametrize("event", [
+    {"node": "NODE-001", "timestamp": "yesterday"},
+    {"node": "NODE-001", "timestamp": "nan"},
+    {"node": "NODE-001", "bytes": -1},
+    {"node": "NODE-001", "points": -5},
+])
+def test_parse_events_rejects_bad_values(event):
+    with pytest.raises(ValueError):
+        parse_events(json.dumps([event]))
+
+
+@pytest.mark.parametrize("event", [
+    {"node": "NODE-001", "timestamp": "yesterday"},
+    {"node": "NODE-001", "points": -5},
+])
+def test_bad_events_get_400_and_leave_totals_alone(event):
+    registry = NodeRegistry(default_nodes())
+    before = registry.total_data_points
+    server = serve(NodeTelemetry(registry), 0, host="127.0.0.1")
+    try:
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{server.server_address[1]}/events", data=json.dumps([event]).encode(), method="POST"
+        )
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(request, timeout=5)
+        assert error.value.code == 400
+    finally:
+        server.shutdown()
+    assert registry.total_data_points == before